@@ -0,0 +1,75 @@
+"""
+micro-benchmark for the DialogFacade accessors used on every frame
+
+usage: python benchmarks/bench_dialog.py
+"""
+
+import json
+import sys
+import tempfile
+import timeit
+import tomllib
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "pynarrator"))
+
+from config import Config  # noqa: E402
+from model import DialogFacade  # noqa: E402
+
+FRAMES = 10_000
+
+
+def frame(model: DialogFacade) -> None:
+    "dialog accesses done by GameView / GameController for one frame"
+    model.current
+    model.current_options
+    model.current_options
+
+
+def frame_with_copies(model: DialogFacade) -> None:
+    "same accesses, copying the node like the mutable node representation required"
+    deepcopy(model.current)
+    deepcopy(model.current_options)
+    deepcopy(model.current_options)
+
+
+def measure(func, model: DialogFacade) -> tuple[float, int]:
+    "returns the time (us) per frame and the peak of memory (bytes) allocated by a frame"
+    seconds = timeit.timeit(lambda: func(model), number=FRAMES)
+
+    tracemalloc.start()
+    for _ in range(FRAMES):
+        func(model)
+    # frame allocations are garbage right away, so the peak is one frame worth
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds / FRAMES * 1e6, peak
+
+
+def build_dialogs(target: Path, language: str) -> None:
+    "converts the example dialog to the json format used at runtime"
+    (target / language).mkdir(parents=True)
+    for file in (ROOT / "dialog").rglob("*.toml"):
+        with open(file, "rb") as fp:
+            dialog = tomllib.load(fp)
+        with open(target / language / f"{dialog['label']}.json", "w") as fp:
+            json.dump(dialog, fp)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = Config(dialog_path=tmp_dir)
+        build_dialogs(Path(tmp_dir), config.language)
+        model = DialogFacade(config)
+
+        for name, func in (("shared", frame), ("deepcopy", frame_with_copies)):
+            micros, peak = measure(func, model)
+            print(f"{name:>10}: {micros:8.2f} us/frame  {peak:8d} bytes peak")
+
+
+if __name__ == "__main__":
+    main()
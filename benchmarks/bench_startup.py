@@ -0,0 +1,83 @@
+"""
+startup benchmark, time from process start to the first frame on the screen
+
+usage: python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_dialog import ROOT, build_dialogs
+
+sys.path.insert(0, str(ROOT / "pynarrator"))
+
+from config import Config  # noqa: E402
+
+# seconds from process start to the first frame, the run fails above it
+BUDGET = 1.5
+RUNS = 5
+
+# runs the game in a new interpreter until its first frame is drawn
+GAME = f"""
+import sys, time
+sys.path.insert(0, {str(ROOT / "pynarrator")!r})
+import main
+print("import", time.time())
+main.main(max_frames=1)
+print("frame", time.time())
+"""
+
+
+def run_game(cwd: Path) -> dict[str, float]:
+    "seconds from process start to the end of the imports and to the first frame"
+    # no window needed, the frame is drawn to an off screen surface
+    env = {**os.environ, "SDL_VIDEODRIVER": "dummy", "SDL_AUDIODRIVER": "dummy"}
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", GAME],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stdout.splitlines():
+        name, _, stamp = line.partition(" ")
+        if name in ("import", "frame"):
+            times[name] = float(stamp) - start
+    return times
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # the game data at the default (relative) paths of Config
+        cwd = Path(tmp_dir)
+        config = Config()
+        build_dialogs(cwd / config.dialog_path, config.language)
+        (cwd / config.image_path).symlink_to(ROOT / "img")
+
+        samples = [run_game(cwd) for _ in range(runs)]
+
+    for name in ("import", "frame"):
+        values = [sample[name] for sample in samples]
+        print(
+            f"{name:>10}: {statistics.median(values) * 1e3:8.1f} ms median"
+            f"  {min(values) * 1e3:8.1f} ms min"
+        )
+
+    first_frame = statistics.median(sample["frame"] for sample in samples)
+    print(f"{'budget':>10}: {BUDGET * 1e3:8.1f} ms")
+    if first_frame > BUDGET:
+        print("startup is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
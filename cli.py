@@ -1,8 +1,12 @@
 import argparse
+import os
+import sys
+import time
 
 import PyInstaller.__main__
 
-from hooks import hook_resizer, hook_translate
+from hooks import hook_compile, hook_pack, hook_resizer, hook_translate
+from hooks.scheduler import Scheduler, Stage
 
 
 def build_with_pyinstaller(args):
@@ -11,12 +15,11 @@ def build_with_pyinstaller(args):
             args.source_file,
             f"--name={args.output_name}",
             "--paths=.",
-            f"--add-data={args.dialog_dir}:dialog",
-            f"--add-data={args.img_dir}:img",
-            "--add-data=save:save",
-            "--add-data=translated_dialog:translated_dialog",
-            "--add-data=resized_img:resized_img",
-            "--onefile",
+            # dialogs and images are shipped in a single memory mapped archive,
+            # a one file bundle would extract it to a temporary directory on
+            # every launch, so the pack is kept next to the executable instead
+            f"--add-data={hook_pack.PACK_FILE}:.",
+            "--onedir",
             "--windowed",
         ]
     )
@@ -66,20 +69,86 @@ def main():
         "--resolution",
         type=str,
         # required=True,
-        default="fullhd",
-        help="In game image resolution",
+        default="window",
+        help="In game image resolution (window, WxH or an alias like fullhd), extra comma separated resolutions are written to sub directories",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="Worker processes used by the build hooks, shared by the stages running at the same time",
+    )
 
-    # Run Translation Hook
-    hook_translate.main(args)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every build stage, even the ones whose inputs did not change",
+    )
+
+    args = parser.parse_args()
 
-    # Run Resize Hook
-    hook_resizer.main(args)
+    languages = f"languages={args.languages}"
+    stages = [
+        # Run Translation Hook
+        Stage(
+            "translate",
+            hook_translate.main,
+            args,
+            inputs=[f"{args.dialog_dir}/**/*.toml"],
+            outputs=["translated_dialog/*/*.json"],
+            params=languages,
+        ),
+        # Compile translated dialogs into a binary graph per language
+        Stage(
+            "compile",
+            hook_compile.main,
+            args,
+            deps=["translate"],
+            inputs=["translated_dialog/*/*.json"],
+            outputs=[
+                "translated_dialog/*/dialogs.bin",
+                "translated_dialog/*/dialogs.index",
+            ],
+            jobs=args.jobs,
+        ),
+        # Run Resize Hook, independent from the dialogs
+        Stage(
+            "resize",
+            hook_resizer.main,
+            args,
+            inputs=[f"{args.img_dir}/**/*"],
+            outputs=["resized_img/**/*"],
+            params=f"resolution={args.resolution}",
+            jobs=args.jobs,
+        ),
+        # Bundle the compiled dialogs and images in a single file
+        Stage(
+            "pack",
+            hook_pack.main,
+            args,
+            deps=["compile", "resize"],
+            inputs=["translated_dialog/*/dialogs.bin", "resized_img/*"],
+            outputs=[hook_pack.PACK_FILE],
+        ),
+        # run PyInstaller
+        Stage(
+            "pyinstaller",
+            build_with_pyinstaller,
+            args,
+            deps=["pack"],
+            inputs=[hook_pack.PACK_FILE, "pynarrator/**/*.py"],
+            outputs=[f"dist/{args.output_name}/**/*"],
+            params=f"source={args.source_file},name={args.output_name}",
+        ),
+    ]
 
-    # run PyInstaller
-    build_with_pyinstaller(args)
+    start = time.perf_counter()
+    # stages running at the same time split --jobs between their worker pools
+    results = Scheduler(stages, force=args.force, jobs=args.jobs).run()
+    print(Scheduler.report(results, time.perf_counter() - start))
+    if any(result.status in ("failed", "blocked") for result in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
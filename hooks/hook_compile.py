@@ -0,0 +1,38 @@
+import logging
+import sys
+from pathlib import Path
+
+# the game modules expect the pynarrator directory to be the import root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pynarrator"))
+
+from model import (LazyDialogs, LoadDialogs, compiled_path,  # noqa: E402
+                   write_compiled)
+
+
+class CompileDialogs:
+    def __init__(self, source: str, jobs: int = 1) -> None:
+        assert Path(source).exists()
+        self.source_dir = Path(source)
+        self.jobs = jobs
+
+    def run(self) -> None:
+        logging.info("> Starting Dialog Compilation")
+        for language_dir in sorted(p for p in self.source_dir.glob("*") if p.is_dir()):
+            dialogs = LoadDialogs.load_graph(language_dir, self.jobs)
+            target = compiled_path(self.source_dir, language_dir.name)
+            write_compiled(dialogs, target)
+            # label -> file index used when loading dialogs lazily
+            LazyDialogs.write_index(language_dir)
+            logging.info(f"{len(dialogs)} dialogs compiled to {target}")
+        logging.info("> Done with Dialog Compilation")
+
+
+def main(args=None, jobs=None):
+    source_dir = "./translated_dialog"
+    # jobs is the share of --jobs given by the build scheduler
+    jobs = jobs or (1 if args is None else args.jobs)
+    CompileDialogs(source_dir, jobs).run()
+
+
+if __name__ == "__main__":
+    main()
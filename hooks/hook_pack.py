@@ -0,0 +1,52 @@
+import logging
+import sys
+from pathlib import Path
+
+# the game modules expect the pynarrator directory to be the import root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pynarrator"))
+
+# only pack, importing model would set up the game logger (and its log file)
+from pack import (PACK_FILE, compiled_path, dialog_entry,  # noqa: E402
+                  image_entry, write_pack)
+
+# written by hook_resizer.py along the images, not needed by the game
+RESIZER_MANIFEST = "manifest.json"
+
+
+class PackAssets:
+    def __init__(self, dialog_source: str, image_source: str, target: str) -> None:
+        assert Path(dialog_source).exists()
+        assert Path(image_source).exists()
+        self.dialog_dir = Path(dialog_source)
+        self.image_dir = Path(image_source)
+        self.target = Path(target)
+
+    def run(self) -> None:
+        logging.info(f"> Starting Asset Packing to {self.target}")
+        files, languages = {}, []
+        for language_dir in sorted(p for p in self.dialog_dir.glob("*") if p.is_dir()):
+            compiled = compiled_path(self.dialog_dir, language_dir.name)
+            if not compiled.exists():
+                logging.error(f"Missing compiled dialogs for {language_dir.name!r}")
+                continue
+            languages.append(language_dir.name)
+            files[dialog_entry(language_dir.name)] = compiled
+
+        # only the images at the game resolution (the top level outputs of
+        # hook_resizer.py), whatever their format
+        for image in sorted(self.image_dir.iterdir()):
+            if image.is_file() and image.name != RESIZER_MANIFEST:
+                files[image_entry(image.name)] = image
+
+        write_pack(self.target, languages, files)
+        logging.info(f"> Done with Packing, {len(files)} files in {self.target}")
+
+
+def main(args=None):
+    dialog_dir = "./translated_dialog"
+    image_dir = "./resized_img"
+    PackAssets(dialog_dir, image_dir, PACK_FILE).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,83 @@
+import hashlib
+import json
 import logging
-import shutil
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from PIL import Image
 
+# the game modules expect the pynarrator directory to be the import root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pynarrator"))
+
+from config import Config  # noqa: E402
+
+# output file -> source hash and resolution it was resized from
+MANIFEST_FILE = "manifest.json"
+
+
+def resize_file(
+    source: Path, outputs: list[tuple[tuple[int, int], Path]]
+) -> str | None:
+    "decodes an image once and writes a resized copy per output, returns the error if any"
+    try:
+        with Image.open(source) as image:
+            image.load()
+            # the display surface has no alpha, converting here spares it at runtime
+            image = image.convert("RGB")
+            for resolution, dst in outputs:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                resized = image.resize(resolution, Image.Resampling.LANCZOS)
+                if dst.suffix.lower() == ".png":
+                    # uncompressed png, decoding is a copy instead of an inflate
+                    resized.save(dst, compress_level=0)
+                else:
+                    # other formats (e.g. jpeg) have no uncompressed mode and are
+                    # still decoded by the game, only resized
+                    resized.save(dst)
+    except Exception as exp:
+        return str(exp)
+    return None
+
 
 class ResizeImages:
-    def __init__(self, resolution_alias: str, source: str, target: str) -> None:
-        self.resolution = self.to_resolution(resolution_alias)
+    """
+    resizes the source images to one or more resolutions
+    - the first resolution is written to the target directory, the others to a
+    sub directory named after their alias (e.g. resized_img/4k/)
+    - each source is decoded once, no matter how many resolutions are requested
+    - outputs whose source and resolution did not change since the last build
+    are skipped (see MANIFEST_FILE)
+    - images are resized by a process pool when jobs > 1
+    - "window" targets the game window size (Config), so the game can blit the
+    images without scaling them again
+    """
+
+    def __init__(
+        self, resolution_aliases: str, source: str, target: str, jobs: int = 1
+    ) -> None:
+        self.aliases = [a.strip().lower() for a in resolution_aliases.split(",")]
+        self.resolutions = [self.to_resolution(alias) for alias in self.aliases]
+        self.jobs = jobs
 
         assert Path(source).exists()
         self.source_dir = Path(source)
 
         self.target_dir = Path(target)
         self.target_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.target_dir / MANIFEST_FILE
 
     @staticmethod
     def to_resolution(alias: str) -> tuple[int, int]:
         match alias.strip().lower():
+            case "window":
+                # the game window, images are shown without being scaled again
+                config = Config()
+                return (config.width, config.height)
+            case size if re.fullmatch(r"\d+x\d+", size):
+                width, height = size.split("x")
+                return (int(width), int(height))
             case "hd":
                 return (1280, 720)
             case "fullhd":
@@ -31,43 +91,96 @@ class ResizeImages:
             case _:
                 return (1280, 720)
 
-    def resize_img(self, input: Path) -> Image:
-        image = Image.open(str(input))
-        return image.resize(self.resolution, Image.Resampling.LANCZOS)
-
-    def save_img(self, src_file: Path, img: Image) -> None:
-        dst = self.target_dir / src_file.name
-        img.save(str(dst))
+    @staticmethod
+    def file_hash(file: Path) -> str:
+        return hashlib.blake2b(file.read_bytes(), digest_size=16).hexdigest()
+
+    def output_paths(self, file: Path) -> list[tuple[tuple[int, int], Path]]:
+        "where each resolution of a source image is written"
+        outputs = [(self.resolutions[0], self.target_dir / file.name)]
+        for alias, resolution in zip(self.aliases[1:], self.resolutions[1:]):
+            outputs.append((resolution, self.target_dir / alias / file.name))
+        return outputs
+
+    def load_manifest(self) -> dict[str, dict]:
+        try:
+            with open(self.manifest_path, "r") as fp:
+                return json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest: dict[str, dict]) -> None:
+        with open(self.manifest_path, "w") as fp:
+            json.dump(manifest, fp, indent=2, sort_keys=True)
+
+    def plan(
+        self, manifest: dict[str, dict]
+    ) -> tuple[dict[str, dict], list[tuple[Path, list]]]:
+        "manifest of the current sources and the outputs that need to be (re)written"
+        current, tasks = {}, []
+        for file in sorted(p for p in self.source_dir.rglob("*") if p.is_file()):
+            digest = self.file_hash(file)
+            stale = []
+            for resolution, dst in self.output_paths(file):
+                key = dst.relative_to(self.target_dir).as_posix()
+                current[key] = {"source": digest, "resolution": list(resolution)}
+                if manifest.get(key) != current[key] or not dst.exists():
+                    stale.append((resolution, dst))
+            if stale:
+                tasks.append((file, stale))
+        return current, tasks
+
+    def resize(self, tasks: list[tuple[Path, list]]) -> list[tuple[Path, list, str]]:
+        "runs the resize tasks, returns the ones that failed with their error"
+        errors = []
+        if self.jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = {
+                    executor.submit(resize_file, file, outputs): (file, outputs)
+                    for file, outputs in tasks
+                }
+                for future in as_completed(futures):
+                    if (error := future.result()) is not None:
+                        errors.append((*futures[future], error))
+        else:
+            for file, outputs in tasks:
+                if (error := resize_file(file, outputs)) is not None:
+                    errors.append((file, outputs, error))
+        return errors
 
     def run(self) -> None:
-        logging.info(f"> Starting Image Resizing To {self.resolution}")
-        for file in self.source_dir.rglob("*"):
-            logging.info(f"trying to load file: {file}")
-            try:
-                img = self.resize_img(file)
-                self.save_img(file, img)
-                logging.info(f"image {file.name!r} was resized")
-            except Exception as exp:
-                logging.error(f"error {exp} while resizing image: {file}")
-                continue
+        logging.info(f"> Starting Image Resizing To {', '.join(self.aliases)}")
+        previous = self.load_manifest()
+        manifest, tasks = self.plan(previous)
+        written = sum(len(outputs) for _, outputs in tasks)
+        logging.info(f"{written} of {len(manifest)} outputs need to be resized")
+
+        for file, outputs, error in self.resize(tasks):
+            logging.error(f"error {error} while resizing image: {file}")
+            # keep the previous outputs, they are retried on the next build
+            for _, dst in outputs:
+                key = dst.relative_to(self.target_dir).as_posix()
+                if key in previous:
+                    manifest[key] = previous[key]
+                else:
+                    manifest.pop(key, None)
+
+        # outputs of deleted sources or dropped resolutions
+        for key in previous.keys() - manifest.keys():
+            (self.target_dir / key).unlink(missing_ok=True)
+
+        self.save_manifest(manifest)
         logging.info("> Done with Resizing")
 
 
-def clean_dir(dir: str) -> None:
-    dir = Path(dir)
-    dir.mkdir(parents=True, exist_ok=True)
-
-    for dir in (p for p in dir.glob("*") if p.is_dir()):
-        shutil.rmtree(dir)
-
-
-def main(args=None):
-    resolution = "hd" if args is None else args.resolution
+def main(args=None, jobs=None):
+    resolution = "window" if args is None else args.resolution
     source_dir = "./img" if args is None else args.img_dir
+    # jobs is the share of --jobs given by the build scheduler
+    jobs = jobs or (1 if args is None else args.jobs)
     target_dir = "./resized_img"
 
-    clean_dir(target_dir)
-    ResizeImages(resolution, source_dir, target_dir).run()
+    ResizeImages(resolution, source_dir, target_dir, jobs).run()
 
 
 if __name__ == "__main__":
@@ -1,45 +1,121 @@
 import json
 import logging
-import os
 import shutil
+import sys
+import threading
+import time
 import tomllib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Iterable, Iterator, Protocol
 
 from deep_translator import GoogleTranslator
 
+# the game modules expect the pynarrator directory to be the import root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "pynarrator"))
 
-class TranslateDialogs:
-    def __init__(self, target_language: str, source: str, target: str) -> None:
-        self.source_language = "portuguese"
-        self.target_language = target_language
+from config import Config  # noqa: E402
+from translation_memory import TranslationMemory  # noqa: E402
 
-        self.translator = GoogleTranslator(
-            source=self.source_language, target=self.target_language
-        )
+# all the translated dialogs of a language, as a json list
+OUTPUT_FILE = "dialogs.json"
 
-        assert Path(source).exists()
-        self.source_dir = Path(source)
 
-        self.target_dir = Path(target) / self.target_language
-        self.target_dir.mkdir(parents=True, exist_ok=True)
+class TranslatorBackend(Protocol):
+    "translates a batch of strings, returning them in the same order"
 
-    def translate_dialog(self, dialog: dict) -> dict:
-        return dict(self.translate_key_value(k, v) for k, v in dialog.items())
+    name: str
 
-    def translate_key_value(self, key: str, value: Any) -> tuple[str, Any]:
-        match key, value:
-            case "text", str():
-                return key, self.translator.translate(value)
-            case str(), dict():
-                translated_dict = dict(
-                    self.translate_key_value(k, v) for k, v in value.items()
-                )
-                return (key, translated_dict)
-            case _:
-                return key, value
+    def translate_batch(
+        self, texts: list[str], source: str, target: str
+    ) -> list[str]: ...
+
+
+class GoogleBackend:
+    name = "google"
+
+    def translate_batch(self, texts: list[str], source: str, target: str) -> list[str]:
+        translator = GoogleTranslator(source=source, target=target)
+        return translator.translate_batch(texts)
+
+
+class LocalBackend:
+    "offline stand-in for tests and dry runs, tags each text with the target language"
+
+    name = "local"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts: list[str], source: str, target: str) -> list[str]:
+        with self._lock:
+            self.calls += 1
+        # simulates the round trip of a remote backend
+        time.sleep(self.delay)
+        return [f"[{target}] {text}" for text in texts]
+
+
+class RateLimiter:
+    "allows at most rate calls per second, shared by all worker threads"
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TranslateDialogs:
+    """
+    translates the source dialogs to every target language in a single streaming pass
+    - read_sources -> extract_segments -> translate_segments -> write_outputs, each
+    stage is a generator consuming the previous one
+    - sources are parsed once and only unique "text" strings are translated
+    - strings are sent in batches to the backend by a bounded thread pool, every
+    batch goes to all languages at once and they share the pool (and the rate limit)
+    - failed batches are retried with exponential backoff
+    - strings found in the translation memory are not sent to the backend
+    - each language is written in bulk to a single file (OUTPUT_FILE)
+    """
+
+    def __init__(
+        self,
+        target_languages: list[str],
+        source: str,
+        target: str,
+        backend: TranslatorBackend | None = None,
+        workers: int = 8,
+        batch_size: int = 32,
+        rate: float = 10.0,
+        retries: int = 3,
+        memory: TranslationMemory | None = None,
+        source_language: str = Config.source_language,
+    ) -> None:
+        self.source_language = source_language
+        self.target_languages = target_languages
+
+        self.backend = GoogleBackend() if backend is None else backend
+        self.workers = workers
+        self.batch_size = batch_size
+        self.rate_limiter = RateLimiter(rate)
+        self.retries = retries
+        self.memory = TranslationMemory() if memory is None else memory
 
-    def load_dialogs(self) -> Iterator[dict]:
+        assert Path(source).exists()
+        self.source_dir = Path(source)
+        self.target_dir = Path(target)
+
+    def read_sources(self) -> Iterator[dict]:
         for file in self.source_dir.rglob("*.toml"):
             logging.info(f"Trying to load file: {file}")
             try:
@@ -50,24 +126,155 @@ class TranslateDialogs:
                 logging.error(f"Error {exp} while reading {file}")
                 continue
 
-    def save_dialog(self, dialog: dict) -> None:
-        if "label" not in dialog and "text" not in dialog:
-            logging.error(f"Bad dialog formatting / structure: {dialog}")
+    @classmethod
+    def collect_texts(cls, value: Any, texts: dict[str, None]) -> None:
+        "adds every string under a 'text' key to texts (a dict used as ordered set)"
+        if not isinstance(value, dict):
             return
+        for key, item in value.items():
+            if key == "text" and isinstance(item, str):
+                texts[item] = None
+            else:
+                cls.collect_texts(item, texts)
 
-        filepath = self.target_dir / f"{dialog['label']}.json"
-        with open(filepath, "w") as fp:
-            json.dump(dialog, fp)
+    def extract_segments(
+        self, dialogs: Iterable[dict]
+    ) -> Iterator[tuple[list[dict], list[str]]]:
+        "groups dialogs until they add batch_size strings not seen before"
+        seen: set[str] = set()
+        batch_dialogs: list[dict] = []
+        batch_texts: dict[str, None] = {}
+        for dialog in dialogs:
+            if "label" not in dialog or "text" not in dialog:
+                logging.error(f"Bad dialog formatting / structure: {dialog}")
+                continue
+            texts: dict[str, None] = {}
+            self.collect_texts(dialog, texts)
+            batch_dialogs.append(dialog)
+            batch_texts.update((text, None) for text in texts if text not in seen)
+            seen.update(texts)
+            if len(batch_texts) >= self.batch_size:
+                yield batch_dialogs, list(batch_texts)
+                batch_dialogs, batch_texts = [], {}
+        if batch_dialogs:
+            yield batch_dialogs, list(batch_texts)
 
-    def run(self):
-        logging.info(f"> Starting Translation to {self.target_language}")
-        for dialog in self.load_dialogs():
-            translated = self.translate_dialog(dialog)
-            self.save_dialog(translated)
+    def submit(self, executor: ThreadPoolExecutor, texts: list[str]) -> dict:
+        "looks up the strings of a batch and sends the missing ones to every language"
+        jobs = {}
+        for language in self.target_languages:
+            if language == self.source_language:
+                jobs[language] = (dict(zip(texts, texts)), [], [])
+                continue
+            cached = self.memory.lookup(
+                texts, self.source_language, language, self.backend.name
+            )
+            missing = [text for text in texts if text not in cached]
+            futures = [
+                executor.submit(
+                    self.translate_batch, missing[i : i + self.batch_size], language
+                )
+                for i in range(0, len(missing), self.batch_size)
+            ]
+            jobs[language] = (cached, missing, futures)
+        return jobs
+
+    def collect(self, jobs: dict, tables: dict[str, dict[str, str]]) -> None:
+        "waits for the translations of a batch and adds them to the tables"
+        for language, (cached, missing, futures) in jobs.items():
+            translated = [text for future in futures for text in future.result()]
+            new = dict(zip(missing, translated))
+            self.memory.store(new, self.source_language, language, self.backend.name)
+            tables[language].update(cached)
+            tables[language].update(new)
+
+    def translate_segments(
+        self, segments: Iterable[tuple[list[dict], list[str]]]
+    ) -> Iterator[tuple[list[dict], dict[str, dict[str, str]]]]:
+        "yields each group of dialogs, in order, with the translation tables of every language"
+        tables = {language: {} for language in self.target_languages}
+        # batches being translated, bounded so reading does not run far ahead
+        in_flight: deque[tuple[list[dict], dict]] = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for dialogs, texts in segments:
+                # the memory is only touched from this thread
+                in_flight.append((dialogs, self.submit(executor, texts)))
+                while in_flight and (
+                    len(in_flight) > 2 * self.workers
+                    or all(
+                        future.done()
+                        for _, _, futures in in_flight[0][1].values()
+                        for future in futures
+                    )
+                ):
+                    dialogs, jobs = in_flight.popleft()
+                    self.collect(jobs, tables)
+                    yield dialogs, tables
+            while in_flight:
+                dialogs, jobs = in_flight.popleft()
+                self.collect(jobs, tables)
+                yield dialogs, tables
+
+    def translate_dialog(self, dialog: dict, table: dict[str, str]) -> dict:
+        return dict(self.translate_key_value(k, v, table) for k, v in dialog.items())
+
+    def translate_key_value(
+        self, key: str, value: Any, table: dict[str, str]
+    ) -> tuple[str, Any]:
+        match key, value:
+            case "text", str():
+                return key, table[value]
+            case str(), dict():
+                return key, self.translate_dialog(value, table)
+            case _:
+                return key, value
+
+    def translate_batch(self, texts: list[str], language: str) -> list[str]:
+        "sends a batch to the backend, retrying with exponential backoff"
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            try:
+                translated = self.backend.translate_batch(
+                    texts, self.source_language, language
+                )
+                if len(translated) != len(texts):
+                    raise ValueError("Backend returned a batch of a different size")
+                return translated
+            except Exception as exp:
+                if attempt == self.retries:
+                    raise
+                delay = 0.5 * 2**attempt
+                logging.warning(
+                    f"Error {exp} while translating to {language!r}, retrying in {delay}s"
+                )
+                time.sleep(delay)
+
+    def write_outputs(
+        self, translated: Iterable[tuple[list[dict], dict[str, dict[str, str]]]]
+    ) -> None:
+        "writes all the dialogs of each language to a single file"
+        outputs = {language: [] for language in self.target_languages}
+        for dialogs, tables in translated:
+            for language, table in tables.items():
+                outputs[language] += [self.translate_dialog(d, table) for d in dialogs]
+
+        for language, dialogs in outputs.items():
+            language_dir = self.target_dir / language
+            language_dir.mkdir(parents=True, exist_ok=True)
+            with open(language_dir / OUTPUT_FILE, "w") as fp:
+                json.dump(dialogs, fp)
             logging.info(
-                f"Dialog {dialog.get('label')!r} was translated to {self.target_language!r}"
+                f"> Done with Translation to {language}, {len(dialogs)} dialogs"
             )
-        logging.info(f"> Done with Translation to {self.target_language}")
+
+    def run(self):
+        logging.info(f"> Starting Translation to {', '.join(self.target_languages)}")
+        dialogs = self.read_sources()
+        segments = self.extract_segments(dialogs)
+        translated = self.translate_segments(segments)
+        self.write_outputs(translated)
+        # printed like the build report, the hooks do not configure logging
+        print(self.memory.report())
 
 
 def clean_dir(dir: str) -> None:
@@ -85,11 +292,21 @@ def main(args: dict[str, str] = None):
     else:
         languages = args.languages
         source_dir = args.dialog_dir
-    target_dir = "./translated_dialog"
+    config = Config()
+    target_dir = config.dialog_path
 
     clean_dir(target_dir)
-    for lang in languages.strip('"').split(","):
-        TranslateDialogs(lang, source_dir, target_dir).run()
+    # translations are kept between builds, only new strings reach the backend
+    memory = TranslationMemory(config.translation_memory_path)
+    languages = languages.strip('"').split(",")
+    TranslateDialogs(
+        languages,
+        source_dir,
+        target_dir,
+        memory=memory,
+        source_language=config.source_language,
+    ).run()
+    memory.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+CACHE_FILE = ".build_cache.json"
+
+
+@dataclass
+class Stage:
+    """
+    a build step
+    - run(args) is called in a worker process once every stage in deps is done
+    - a stage with its own worker pool sets jobs to the most workers it can use,
+    it is called as run(args, jobs=n) with its share of the scheduler budget
+    - inputs and outputs are glob patterns, params are the options that change
+    the outputs (e.g. the list of languages)
+    """
+
+    name: str
+    run: Callable[[Any], None]
+    args: Any = None
+    deps: list[str] = field(default_factory=list)
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    params: str = ""
+    jobs: int = 1
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+
+
+def fingerprint(patterns: list[str], params: str = "") -> str:
+    "hash of the paths, sizes and modification times of the matched files"
+    digest = hashlib.blake2b(params.encode("utf-8"), digest_size=16)
+    for pattern in patterns:
+        for file in sorted(glob.glob(pattern, recursive=True)):
+            if os.path.isfile(file):
+                stat = os.stat(file)
+                digest.update(f"{file}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def run_stage(run: Callable[..., None], args: Any, jobs: int | None = None) -> float:
+    "runs a stage, returns the cpu time used by it and by the processes it waited for"
+    start = os.times()
+    if jobs is None:
+        run(args)
+    else:
+        run(args, jobs=jobs)
+    end = os.times()
+    # user, system, children user, children system
+    return sum(end[:4]) - sum(start[:4])
+
+
+class Scheduler:
+    """
+    runs build stages as a DAG, independent stages run concurrently
+    - a stage is skipped when its inputs and outputs did not change since its
+    last successful run (fingerprints are kept in CACHE_FILE)
+    - stages depending on a failed stage are not run
+    - running stages share a budget of jobs (one per core by default), the
+    workers of a stage pool count against it, so parallel stages do not
+    oversubscribe the cpu
+    """
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        cache_file: str = CACHE_FILE,
+        force: bool = False,
+        jobs: int | None = None,
+    ) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name!r} depends on unknown {dep!r}")
+        self.cache_file = Path(cache_file)
+        self.force = force
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+
+    def load_cache(self) -> dict[str, dict]:
+        try:
+            with open(self.cache_file, "r") as fp:
+                return json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_cache(self, cache: dict[str, dict]) -> None:
+        with open(self.cache_file, "w") as fp:
+            json.dump(cache, fp, indent=2, sort_keys=True)
+
+    def run(self) -> list[StageResult]:
+        cache = self.load_cache()
+        pending = dict(self.stages)
+        results: dict[str, StageResult] = {}
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=len(self.stages) or 1) as executor:
+            while pending or running:
+                ready = []
+                for stage in list(pending.values()):
+                    statuses = [results.get(dep) for dep in stage.deps]
+                    if any(
+                        r is not None and r.status in ("failed", "blocked")
+                        for r in statuses
+                    ):
+                        del pending[stage.name]
+                        results[stage.name] = StageResult(stage.name, "blocked")
+                        continue
+                    if any(r is None for r in statuses):
+                        continue
+
+                    inputs = fingerprint(stage.inputs, stage.params)
+                    outputs = fingerprint(stage.outputs)
+                    entry = {"inputs": inputs, "outputs": outputs}
+                    if not self.force and cache.get(stage.name) == entry:
+                        del pending[stage.name]
+                        results[stage.name] = StageResult(stage.name, "skipped")
+                        continue
+                    ready.append((stage, inputs))
+
+                for i, (stage, inputs) in enumerate(ready):
+                    free = self.jobs - sum(jobs for *_, jobs in running.values())
+                    # ready stages wait for a free job, unless nothing is running
+                    if free < 1 and running:
+                        break
+                    # split what is left between the stages ready to start
+                    jobs = max(1, min(stage.jobs, free // (len(ready) - i)))
+
+                    del pending[stage.name]
+                    logging.info(f"> Stage {stage.name!r} started with {jobs} jobs")
+                    future = executor.submit(
+                        run_stage,
+                        stage.run,
+                        stage.args,
+                        jobs if stage.jobs > 1 else None,
+                    )
+                    running[future] = (stage, inputs, time.perf_counter(), jobs)
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Cyclic stage dependencies: {list(pending)}")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, inputs, start, _ = running.pop(future)
+                    wall_time = time.perf_counter() - start
+                    try:
+                        cpu_time = future.result()
+                    except Exception as exp:
+                        logging.error(f"Stage {stage.name!r} failed: {exp!r}")
+                        cache.pop(stage.name, None)
+                        results[stage.name] = StageResult(
+                            stage.name, "failed", wall_time
+                        )
+                        continue
+                    cache[stage.name] = {
+                        "inputs": inputs,
+                        "outputs": fingerprint(stage.outputs),
+                    }
+                    results[stage.name] = StageResult(
+                        stage.name, "done", wall_time, cpu_time
+                    )
+
+        self.save_cache(cache)
+        return [results[name] for name in self.stages]
+
+    @staticmethod
+    def report(results: list[StageResult], wall_time: float) -> str:
+        "per stage wall and cpu time table"
+        lines = [f"{'stage':<12} {'status':<8} {'wall (s)':>9} {'cpu (s)':>9}"]
+        for r in results:
+            lines.append(
+                f"{r.name:<12} {r.status:<8} {r.wall_time:>9.2f} {r.cpu_time:>9.2f}"
+            )
+        lines.append(f"{'total':<12} {'':<8} {wall_time:>9.2f}")
+        return "\n".join(lines)
@@ -3,20 +3,62 @@ import sys
 from dataclasses import dataclass
 from pathlib import Path
 
+from pack import PACK_FILE, get_asset_pack
+
 
 @dataclass
 class Config:
     source_dialog_path: str = "./dialog"
+    # language the source dialogs are written in
+    source_language: str = "portuguese"
     dialog_path: str = "./translated_dialog"
+    # translations kept between builds, only new strings are translated again
+    translation_memory_path: str = "./translation_memory.db"
 
     source_image_path: str = "./img"
     image_path: str = "./resized_img"
 
+    # single file archive with the compiled dialogs and images (see pack.py),
+    # read instead of the directories above when set
+    pack_path: str | None = None
+
     save_path: str = "./save"
+    # number of save slots listed in the load game menu
+    save_slots: int = 3
+    # minimum time between two writes of the save file (seconds)
+    autosave_interval: float = 5.0
+    # keep only the most recent dialog nodes visited (None keeps all of them)
+    history_limit: int | None = None
+    # check that a loaded save follows the dialog options (costs a walk of the history)
+    verify_saves: bool = False
 
     width: int = 1208
     height: int = 720
 
+    # frame cap and how long the main loop sleeps waiting for input (ms)
+    fps: int = 30
+    idle_timeout: int = 1000
+    # only push the screen regions that changed instead of the whole frame
+    dirty_rects: bool = True
+
+    # memory budget for decoded background images
+    image_cache_bytes: int = 64 * 1024 * 1024
+    # how many composed dialog screens (one full screen surface each) are kept
+    frame_cache_size: int = 8
+    # decode the images of the nodes reachable from the current one in the background
+    prefetch: bool = True
+
+    # worker processes used to parse dialog files
+    jobs: int = 1
+
+    # parse dialog nodes on their first visit instead of at startup
+    lazy_dialogs: bool = False
+    # how many decoded dialog nodes are kept in memory by lazy dialog stores
+    node_cache_size: int = 1024
+    # authoring mode, read the source dialogs and reload them when edited
+    watch_dialogs: bool = False
+    watch_interval: float = 1.0
+
     languages = ["english", "portuguese", "german"]
     language = "portuguese"
 
@@ -38,8 +80,14 @@ class Config:
         self.source_image_path = os.path.join(base_path, "img")
         self.image_path = os.path.join(base_path, "resized_img")
 
-        self.save_path = os.path.join(base_path, "save")
+        # the build ships a single asset pack, saves go to the working directory
+        # instead of the temporary directory the bundle is extracted to
+        self.pack_path = os.path.join(base_path, PACK_FILE)
         self.languages = self.get_languages()
 
     def get_languages(self) -> list[str]:
+        # languages are listed in the pack index, no need to scan directories
+        pack = get_asset_pack(self.pack_path)
+        if pack is not None:
+            return list(pack.languages)
         return [p.name for p in Path(self.dialog_path).glob("*") if p.is_dir()]
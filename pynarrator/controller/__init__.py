@@ -3,3 +3,4 @@ from controller.game import *
 from controller.language_menu import *
 from controller.menu import *
 from controller.name_screen import *
+from controller.slot_menu import *
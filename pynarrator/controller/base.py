@@ -14,6 +14,7 @@ class GameStateEnum(Enum):
     Game = 2
     LanguageMenu = 3
     NameScreen = 4
+    SlotMenu = 5
 
 
 @dataclass
@@ -34,6 +35,7 @@ GameStateMenu = GameState(GameStateEnum.Menu, _vars)
 GameStateGame = GameState(GameStateEnum.Game, _vars)
 GameStateLanguageMenu = GameState(GameStateEnum.LanguageMenu, _vars)
 GameStateNameScreen = GameState(GameStateEnum.NameScreen, _vars)
+GameStateSlotMenu = GameState(GameStateEnum.SlotMenu, _vars)
 
 
 class BaseController:
@@ -54,7 +56,9 @@ class BaseController:
 
     def handle_events(self, event: Event) -> None:
         "handles click events and call the appropriated callback function"
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        if event.type == pygame.MOUSEMOTION:
+            self.view.hover(event.pos)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             mouse_pos = event.pos
             for i, rect in enumerate(self.view.option_rects):
                 if rect.collidepoint(mouse_pos):
@@ -1,11 +1,9 @@
-import json
-from pathlib import Path
 from typing import Callable
 
 from config import Config
 from controller.base import (BaseController, GameState, GameStateGame,
                              GameStateMenu)
-from model import DialogFacade
+from model import DialogFacade, get_save_slots
 from view import GameView
 
 
@@ -15,6 +13,7 @@ class GameController(BaseController):
     def __init__(self, config: Config, model: DialogFacade, view: GameView) -> None:
         super().__init__(config, model, view)
         self.state: GameState = GameStateGame
+        self.slots = get_save_slots(config)
 
     def update_callbacks(self) -> None:
         "sets up callbacks for each dialog option in the game view"
@@ -29,17 +28,22 @@ class GameController(BaseController):
         def chose() -> None:
             label = self.view.option_labels[n]
             self.model.next(label)
+            self.save_game(self.model.dump())
 
         return chose
 
     def goto_menu(self) -> None:
         "save game state and go to menu"
-        history = list(self.model.history)
-        self.save_game(history)
+        self.save_game(self.model.dump())
         self.state = GameStateMenu
 
-    def save_game(self, history: list[str]) -> None:
-        "save game state as a history if the nodes visited"
-        path = Path(self.config.save_path) / "save.json"
-        with open(path, "w") as fp:
-            json.dump(history, fp)
+    def save_game(self, save: dict) -> None:
+        "save game state, the current node and the history of the nodes visited"
+        # written in the background along with the slot index, see model.slots
+        self.slots.save(
+            int(self.state.vars["slot"] or 0),
+            save,
+            label=self.model.current.label,
+            player=self.state.vars["user_name"],
+            language=self.config.language,
+        )
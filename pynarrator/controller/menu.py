@@ -1,13 +1,11 @@
-import json
 import sys
-from pathlib import Path
 
 import pygame
 from config import Config
-from controller.base import (BaseController, GameState, GameStateGame,
-                             GameStateLanguageMenu, GameStateMenu,
-                             GameStateNameScreen)
-from model import DialogFacade
+from controller.base import (BaseController, GameState, GameStateLanguageMenu,
+                             GameStateMenu, GameStateNameScreen,
+                             GameStateSlotMenu)
+from model import DialogFacade, get_save_slots
 from view import MenuView
 
 
@@ -17,6 +15,7 @@ class MenuController(BaseController):
     def __init__(self, config: Config, model: DialogFacade, view: MenuView) -> None:
         super().__init__(config, model, view)
         self.state: GameState = GameStateMenu
+        self.slots = get_save_slots(config)
 
     def update_callbacks(self) -> None:
         "start, load and exit menu button callbacks"
@@ -30,23 +29,13 @@ class MenuController(BaseController):
     def start_game(self) -> None:
         "change game state"
         self.model.reset()
+        # new games take an empty slot, or overwrite the oldest one
+        self.state.vars["slot"] = str(self.slots.free_slot())
         self.state = GameStateNameScreen
 
     def load_game(self) -> None:
-        "loads save game"
-        self.state = GameStateGame
-
-        # check if save game exists
-        path = Path(self.config.save_path) / "save.json"
-        if not path.exists():
-            return
-
-        # load save
-        with open(path, "r") as fp:
-            history = json.load(fp)
-
-        # advance game state using history
-        self.model.load(history)
+        "goto save slot menu"
+        self.state = GameStateSlotMenu
 
     def chose_language(self) -> None:
         "goto language menu"
@@ -54,5 +43,6 @@ class MenuController(BaseController):
 
     def exit(self) -> None:
         "exits game"
+        self.slots.close()
         pygame.quit()
         sys.exit()
@@ -0,0 +1,50 @@
+from typing import Callable
+
+from config import Config
+from controller.base import (BaseController, GameState, GameStateGame,
+                             GameStateMenu, GameStateSlotMenu)
+from model import DialogFacade, get_save_slots
+from view import SlotMenuView
+
+
+class SlotMenuController(BaseController):
+    "controller for the load game menu, restoring the chosen save slot"
+
+    def __init__(self, config: Config, model: DialogFacade, view: SlotMenuView) -> None:
+        self.slots = get_save_slots(config)
+        super().__init__(config, model, view)
+        self.state: GameState = GameStateSlotMenu
+
+    def update_callbacks(self) -> None:
+        "sets up callbacks for each save slot and the back button"
+        self.options_callbacks = [
+            self.load_nth_slot(slot) for slot in range(self.slots.slots)
+        ]
+        self.options_callbacks.append(self.goto_menu)
+
+    def load_nth_slot(self, n: int) -> Callable:
+        "helper function / clousure for loading a save slot based on a clicked event"
+
+        def load() -> None:
+            metadata = self.slots.metadata(n)
+            save = self.slots.load(n)
+            if metadata is None or save is None:
+                return
+
+            # continue in the language the game was saved in
+            language = metadata["language"]
+            if language != self.config.language and language in self.config.languages:
+                self.config.language = language
+                self.model.reload_config(self.config)
+
+            # jump to the saved dialog node
+            self.model.load(save, verify=self.config.verify_saves)
+            self.state.vars["slot"] = str(n)
+            self.state.vars["user_name"] = metadata["player"]
+            self.state = GameStateGame
+
+        return load
+
+    def goto_menu(self) -> None:
+        "go back to the main menu"
+        self.state = GameStateMenu
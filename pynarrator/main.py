@@ -1,28 +1,55 @@
+import multiprocessing
+import time
+
 import pygame
 from config import Config
 from controller import (GameController, GameState, GameStateGame,
                         GameStateLanguageMenu, GameStateMenu,
-                        GameStateNameScreen, LanguageMenuController,
-                        MenuController, NameScreenController)
-from model import DialogFacade
-from view import GameView, LanguageMenuView, MenuView, NameScreenView
+                        GameStateNameScreen, GameStateSlotMenu,
+                        LanguageMenuController, MenuController,
+                        NameScreenController, SlotMenuController)
+from model import DialogFacade, get_save_slots
+from view import (GameView, LanguageMenuView, MenuView, NameScreenView,
+                  SlotMenuView)
 
 CLASS_STATE_MAP = (
     (GameStateMenu, MenuView, MenuController),
     (GameStateLanguageMenu, LanguageMenuView, LanguageMenuController),
     (GameStateNameScreen, NameScreenView, NameScreenController),
+    (GameStateSlotMenu, SlotMenuView, SlotMenuController),
     (GameStateGame, GameView, GameController),
 )
 
 
+class Controllers(dict):
+    """
+    controllers of each game state, built (with their view) on the first visit
+    - only the main menu is built at startup, screens the player never opens
+    are never loaded
+    """
+
+    def __init__(self, config: Config, model: DialogFacade, screen) -> None:
+        super().__init__()
+        self.config = config
+        self.model = model
+        self.screen = screen
+        self.classes = {state: classes for state, *classes in CLASS_STATE_MAP}
+
+    def __missing__(self, state: GameState):
+        view_class, controller_class = self.classes[state]
+        view = view_class(self.config, self.model, self.screen)
+        controller = self[state] = controller_class(self.config, self.model, view)
+        return controller
+
+
 def init_screen(config: Config):
     pygame.init()
     size = config.width, config.height
     return pygame.display.set_mode(size)
 
 
-def main():
-    "main game loop"
+def main(max_frames: int | None = None):
+    "main game loop, max_frames stops it after rendering that many frames"
 
     # Initialize Config
     config = Config()
@@ -33,18 +60,26 @@ def main():
     # Initialize dialog model
     model = DialogFacade(config)
 
-    # Initialize components
-    controllers = {}
-    for state, view_class, controler_class in CLASS_STATE_MAP:
-        view = view_class(config, model, screen)
-        controller = controler_class(config, model, view)
-        controllers[state] = controller
+    # Initialize components (see Controllers)
+    controllers = Controllers(config, model, screen)
 
     # Main loop
     running = True
     current_state = GameStateMenu
+    rendered_state = None
+    clock = pygame.time.Clock()
+    dirty = True
+    frames = 0
+    last_poll = time.monotonic()
     while running:
-        events = pygame.event.get()
+        if dirty:
+            events = pygame.event.get()
+        else:
+            # nothing to redraw, sleep until an event arrives
+            event = pygame.event.wait(config.idle_timeout)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            events += pygame.event.get()
+
         for event in events:
             if event.type == pygame.QUIT:
                 running = False
@@ -58,11 +93,39 @@ def main():
             current_controller.handle_events(event)
             # update current_state variable state
             current_state = current_controller.state
-            # render screen
-            current_controller.view.render()
+            dirty = True
+
+        # authoring mode: pick up dialog files edited while the game runs
+        if (
+            config.watch_dialogs
+            and time.monotonic() - last_poll > config.watch_interval
+        ):
+            last_poll = time.monotonic()
+            dirty = model.poll_changes() or dirty
+
+        if running and dirty:
+            view = controllers[current_state].view
+            # a new screen needs to be drawn from scratch
+            if current_state is not rendered_state:
+                view.invalidate()
+                rendered_state = current_state
+            # render screen once per frame, no matter how many events arrived
+            dirty_rects = view.render()
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            dirty = False
+            frames += 1
+            running = max_frames is None or frames < max_frames
+
+        clock.tick(config.fps)
 
-        pygame.display.flip()
+    # stop the prefetch thread and write the pending save before leaving
+    for controller in controllers.values():
+        controller.view.close()
+    get_save_slots(config).close()
 
 
 if __name__ == "__main__":
+    # dialogs may be parsed by worker processes (Config.jobs)
+    multiprocessing.freeze_support()
     main()
@@ -1 +1,7 @@
+from model.autosave import *
+from model.compiled import *
 from model.dialog import *
+from model.history import *
+from model.node import *
+from model.save import *
+from model.slots import *
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from logger import get_logger
+
+logger = get_logger()
+
+
+def write_atomic(path: Path, data: dict) -> None:
+    "writes json to a temporary file and moves it over path, so a crash never truncates it"
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as fp:
+        json.dump(data, fp)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp_path, path)
+
+
+class Autosave:
+    """
+    writes json files on a background thread so the game loop never waits for the disk
+    - only the most recent data requested for each file is written
+    - writes happen at most once every interval seconds
+    - close() writes whatever is pending and stops the thread
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._latest: dict[Path, dict] = {}
+        self._pending: dict[Path, dict] = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def save(self, path: Path, data: dict) -> None:
+        "schedules a write, returns right away"
+        with self._condition:
+            self._latest[path] = self._pending[path] = data
+            self._condition.notify()
+
+    def load(self, path: Path) -> dict | None:
+        "most recent data of a file, from memory if it was saved in this session"
+        with self._condition:
+            if path in self._latest:
+                return self._latest[path]
+        if not path.exists():
+            return None
+        with open(path, "r") as fp:
+            return json.load(fp)
+
+    def close(self) -> None:
+        "writes the pending files (if any) and stops the writer thread"
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_write = float("-inf")
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                # debounce: wait for the interval, picking up newer saves meanwhile
+                delay = last_write + self.interval - time.monotonic()
+                if delay > 0 and not self._closed:
+                    self._condition.wait(delay)
+                    continue
+                pending, self._pending = self._pending, {}
+
+            for path, data in pending.items():
+                try:
+                    write_atomic(path, data)
+                except OSError as exp:
+                    logger.error(f"Error {exp} while saving game to {path}")
+            last_write = time.monotonic()
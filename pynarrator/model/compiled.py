@@ -0,0 +1,143 @@
+import mmap
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator
+
+from model.node import DialogNode, DialogOption, NodeCache
+# re-exported, the names are defined in pack.py for the build hooks
+from pack import COMPILED_FILE, compiled_path  # noqa: F401
+
+# binary dialog graph format, all integers are little endian
+#   header          magic, version, string count, node count
+#   string offsets  (string count + 1) u32, relative to the string data
+#   node offsets    (node count) u32, relative to the node data
+#   string data     utf-8 strings, the first (node count) strings are the node labels
+#   node data       per node: text id, image id, option count, followed by
+#                   (target node id, text id) for each option
+# a node id is the index of its label in the string table, so labels are
+# interned and options point to other nodes by id
+MAGIC = b"PYND"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHII")
+NODE = struct.Struct("<IIH")
+OPTION = struct.Struct("<II")
+OFFSET = struct.Struct("<I")
+
+
+def compile_dialogs(dialogs: Mapping[str, DialogNode]) -> bytes:
+    "serializes a validated dialog graph into the binary format"
+    labels = sorted(dialogs)
+    strings: dict[str, int] = {label: i for i, label in enumerate(labels)}
+
+    def intern(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    nodes = []
+    for label in labels:
+        node = dialogs[label]
+        record = NODE.pack(intern(node.text), intern(node.image), len(node.options))
+        for option in node.options:
+            record += OPTION.pack(strings[option.label], intern(option.text))
+        nodes.append(record)
+
+    encoded = [text.encode("utf-8") for text in strings]
+    string_offsets, offset = [], 0
+    for data in encoded + [b""]:
+        string_offsets.append(offset)
+        offset += len(data)
+
+    node_offsets, offset = [], 0
+    for record in nodes:
+        node_offsets.append(offset)
+        offset += len(record)
+
+    return b"".join(
+        (
+            HEADER.pack(MAGIC, VERSION, len(encoded), len(nodes)),
+            *(OFFSET.pack(offset) for offset in string_offsets),
+            *(OFFSET.pack(offset) for offset in node_offsets),
+            *encoded,
+            *nodes,
+        )
+    )
+
+
+def write_compiled(dialogs: Mapping[str, DialogNode], path: str | Path) -> None:
+    "compiles a dialog graph and writes it to path"
+    with open(path, "wb") as fp:
+        fp.write(compile_dialogs(dialogs))
+
+
+class CompiledDialogs(Mapping):
+    """
+    read only dialog graph backed by a buffer in the binary format
+    - nodes are decoded on the first access and kept in a bounded LRU
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap, max_nodes: int = 1024) -> None:
+        self._buffer = memoryview(buffer)
+        magic, version, n_strings, n_nodes = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported dialog file (magic {magic}, v{version})")
+
+        self._string_offsets = HEADER.size
+        self._node_offsets = self._string_offsets + (n_strings + 1) * OFFSET.size
+        self._string_data = self._node_offsets + n_nodes * OFFSET.size
+        self._node_data = self._string_data + self._offset(
+            self._string_offsets, n_strings
+        )
+
+        # node labels are the first strings in the table, their index is the node id
+        self._ids = {self._string(i): i for i in range(n_nodes)}
+        self._nodes = NodeCache(max_nodes)
+
+    @classmethod
+    def open(cls, path: str | Path, max_nodes: int = 1024) -> "CompiledDialogs":
+        "memory maps a compiled dialog file"
+        with open(path, "rb") as fp:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, max_nodes)
+
+    def _offset(self, table: int, index: int) -> int:
+        return OFFSET.unpack_from(self._buffer, table + index * OFFSET.size)[0]
+
+    def _string(self, index: int) -> str:
+        start = self._string_data + self._offset(self._string_offsets, index)
+        end = self._string_data + self._offset(self._string_offsets, index + 1)
+        return str(self._buffer[start:end], "utf-8")
+
+    def _decode(self, node_id: int) -> DialogNode:
+        offset = self._node_data + self._offset(self._node_offsets, node_id)
+        text_id, image_id, n_options = NODE.unpack_from(self._buffer, offset)
+        options = (
+            DialogOption(label=self._string(target), text=self._string(text))
+            for target, text in OPTION.iter_unpack(
+                self._buffer[
+                    offset + NODE.size : offset + NODE.size + n_options * OPTION.size
+                ]
+            )
+        )
+        return DialogNode(
+            label=self._string(node_id),
+            text=self._string(text_id),
+            image=self._string(image_id),
+            options=options,
+        )
+
+    def __getitem__(self, label: str) -> DialogNode:
+        node_id = self._ids[label]
+        node = self._nodes.get(node_id)
+        if node is None:
+            node = self._nodes.put(node_id, self._decode(node_id))
+        return node
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._ids
@@ -1,66 +1,147 @@
+import hashlib
 import json
+import os
+import re
 import tomllib
-from copy import deepcopy
-from dataclasses import dataclass, field
-from itertools import chain
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import pairwise
 from pathlib import Path
 from typing import Any, Generator, Iterator
 
 from config import Config
 from logger import get_logger
+from model.compiled import CompiledDialogs, compiled_path
+from model.history import History
+from model.node import DialogNode, DialogOption, NodeCache
+from model.save import decode_save, encode_save
+from pack import dialog_entry, get_asset_pack
 
 logger = get_logger()
 
-
-@dataclass
-class DialogNode:
-    "represent an in game dialog"
-
-    label: str
-    text: str
-    image: str
-
-    options: list["DialogOption"] = field(default_factory=list)
-
-    def __str__(self) -> str:
-        opts = "\n\t".join(map(str, self.options))
-        return f"[DIALOG {self.label!r}]:\n{self.text}\n\t{opts}"
-
-
-@dataclass
-class DialogOption:
-    "represent an option of a given dialog"
-
-    label: str
-    text: str
-
-    def __str__(self) -> str:
-        return f"<OPTION : {self.label!r}>: {self.text}"
+READ_ERRORS = (
+    json.JSONDecodeError,
+    tomllib.TOMLDecodeError,
+    ValueError,
+    FileNotFoundError,
+    PermissionError,
+)
+# number of files parsed by each task when loading dialogs in parallel
+CHUNK_SIZE = 64
+# separators between the dialogs of a bulk (json list) file
+BULK_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def iter_dialogs(content: dict | list | None) -> Iterator[dict]:
+    "dialogs of a file, json files written by the translate hook hold a list of them"
+    if isinstance(content, list):
+        yield from content
+    elif content is not None:
+        yield content
+
+
+def iter_bulk(data: bytes) -> Iterator[tuple[dict, int, int]]:
+    "dialogs of a bulk (json list) file, with the byte range each one takes in it"
+    text = data.decode("utf-8")
+    decoder = json.JSONDecoder()
+    pos = BULK_SEPARATOR.match(text, text.index("[") + 1).end()
+    # byte offset of pos, json.dump escapes non ascii text but others may not
+    last, offset = 0, 0
+    while pos < len(text) and text[pos] != "]":
+        dialog, end = decoder.raw_decode(text, pos)
+        start = offset + len(text[last:pos].encode("utf-8"))
+        last, offset = end, start + len(text[pos:end].encode("utf-8"))
+        yield dialog, start, offset
+        pos = BULK_SEPARATOR.match(text, end).end()
+
+
+def read_files(
+    files: list[Path],
+) -> list[tuple[Path, dict | list | None, str | None]]:
+    "reads dialog files, returning each file with its content or the error found"
+    results = []
+    for file in files:
+        try:
+            results.append((file, LoadDialogs.read_file(file), None))
+        except READ_ERRORS as exp:
+            results.append((file, None, str(exp)))
+    return results
 
 
 class LoadDialogs:
     "function pipeline to read tomls files and parse then into a dialog graph"
 
     @staticmethod
-    def load_tomls(dir_path: Path) -> Iterator[dict]:
+    def scan_files(dir_path: Path) -> Iterator[Path]:
+        "walks a directory tree once, yielding toml and json files"
+        pending = [dir_path]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        pending.append(Path(entry.path))
+                    elif entry.name.endswith((".toml", ".json")):
+                        yield Path(entry.path)
+
+    @staticmethod
+    def load_tomls(dir_path: Path, jobs: int = 1) -> Iterator[dict]:
         "givem a directory, reads all toml files and yield each one of then"
         assert dir_path.exists(), f"Dialog directory {dir_path!r} doesn't exist"
 
-        files = chain(dir_path.rglob("*.toml"), dir_path.rglob("*.json"))
-        for file in files:
-            # find if file is json or toml
-            loader = tomllib.load if file.suffix == "tmol" else json.load
-            try:
-                with open(file, "rb") as fp:
-                    dialog = loader(fp)
-                yield dialog
-            except (
-                json.JSONDecodeError,
-                tomllib.TOMLDecodeError,
-                PermissionError,
-            ) as exp:
-                logger.error(f"Error {exp} while reading {file}")
-                continue
+        files = list(LoadDialogs.scan_files(dir_path))
+        errors = []
+        if jobs > 1 and len(files) > CHUNK_SIZE:
+            chunks = [
+                files[i : i + CHUNK_SIZE] for i in range(0, len(files), CHUNK_SIZE)
+            ]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(read_files, chunk) for chunk in chunks]
+                # yield dialogs as soon as each chunk is parsed
+                for future in as_completed(futures):
+                    for file, dialog, error in future.result():
+                        if error is None:
+                            yield from iter_dialogs(dialog)
+                        else:
+                            errors.append((file, error))
+        else:
+            for file, dialog, error in read_files(files):
+                if error is None:
+                    yield from iter_dialogs(dialog)
+                else:
+                    errors.append((file, error))
+
+        # a single report for all the files that failed
+        if errors:
+            report = "\n".join(f"  {file}: {error}" for file, error in errors)
+            logger.error(f"Error while reading {len(errors)} dialog files:\n{report}")
+
+    @staticmethod
+    def read_file(file: Path, data: bytes = None) -> dict | list:
+        "reads (or decodes the already read data of) a toml or json dialog file"
+        data = file.read_bytes() if data is None else data
+        # find if file is json or toml
+        if file.suffix == ".toml":
+            return tomllib.loads(data.decode("utf-8"))
+        return json.loads(data)
+
+    @staticmethod
+    def load_file(file: Path) -> dict | list | None:
+        "reads a toml or json dialog file, returns None in case of error"
+        try:
+            return LoadDialogs.read_file(file)
+        except READ_ERRORS as exp:
+            logger.error(f"Error {exp} while reading {file}")
+            return None
+
+    @staticmethod
+    def decode_file(file: Path, data: bytes) -> dict | list | None:
+        "decodes the content of a toml or json dialog file, returns None in case of error"
+        try:
+            return LoadDialogs.read_file(file, data)
+        except READ_ERRORS as exp:
+            logger.error(f"Error {exp} while reading {file}")
+            return None
 
     @staticmethod
     def parse_option(opt: dict) -> DialogOption:
@@ -71,23 +152,27 @@ class LoadDialogs:
     def parse_dialog(cls, dialog: dict[str, Any]) -> DialogNode | None:
         "tries to parse a toml object into DialogNode, returns None in case of error"
         try:
-            node = DialogNode(
-                label=dialog.pop("label"),
-                text=dialog.pop("text"),
-                image=dialog.pop("image"),
+            label, text, image = (
+                dialog.pop("label"),
+                dialog.pop("text"),
+                dialog.pop("image"),
             )
-            node.options = [cls.parse_option(opt) for label, opt in dialog.items()]
-            return node
+            options = tuple(cls.parse_option(opt) for opt in dialog.values())
+            return DialogNode(label=label, text=text, image=image, options=options)
         except (ValueError, KeyError) as exp:
             logger.error(f"Error {exp} when parsing {dialog}")
             return None
 
     @staticmethod
-    def validate_dialogs(dialogs: dict[str, DialogNode]) -> None:
-        "checks if all dialog options point to an existing dialog node"
+    def validate_dialogs(
+        dialogs: Mapping[str, DialogNode], labels: Iterable[str] = None
+    ) -> None:
+        "checks if all dialog options (or only the ones of the given nodes) point to an existing dialog node"
+        nodes = dialogs.values() if labels is None else map(dialogs.get, labels)
         missing_labels = [
             option.label
-            for dialog in dialogs.values()
+            for dialog in nodes
+            if dialog is not None
             for option in dialog.options
             if option.label not in dialogs.keys()
         ]
@@ -95,25 +180,311 @@ class LoadDialogs:
             raise Exception(f"Missing Dialog Nodes : {missing_labels}")
 
     @classmethod
-    def run(cls, config: Config) -> dict[str, DialogNode]:
-        "load dialogs from the config"
+    def load_graph(cls, dialog_path: Path, jobs: int = 1) -> dict[str, DialogNode]:
+        "parses and validates all dialog files in a directory"
         # load dialog files
-        dialog_path = Path(config.dialog_path) / config.language
-        tomls = cls.load_tomls(dialog_path)
+        tomls = cls.load_tomls(dialog_path, jobs)
         # try to parse toml files into a dialog graph
         dialog_map = {
             dialog.label: dialog for dialog in map(cls.parse_dialog, tomls) if dialog
         }
         # validated dialogs
         cls.validate_dialogs(dialog_map)
+        return dialog_map
+
+    @classmethod
+    def run(cls, config: Config, language: str = None) -> Mapping[str, DialogNode]:
+        "load dialogs from the config, preferring the compiled graph built by cli.py"
+        language = language or config.language
+        if config.watch_dialogs:
+            # authoring mode, read the source dialogs and follow their changes
+            if language == config.source_language:
+                return DialogWatcher(Path(config.source_dialog_path))
+            # translations are only written by the build, there is nothing to watch
+            logger.error(
+                f"Watch mode only follows the {config.source_language!r} source dialogs,"
+                f" {language!r} is loaded from the build"
+            )
+
+        pack = get_asset_pack(config.pack_path)
+        if pack is not None and dialog_entry(language) in pack:
+            # compiled graph inside the asset pack, read straight from the mapping
+            return CompiledDialogs(
+                pack.read(dialog_entry(language)), config.node_cache_size
+            )
+
+        compiled = compiled_path(config.dialog_path, language)
+        if compiled.exists():
+            # already validated at build time
+            return CompiledDialogs.open(compiled, config.node_cache_size)
+
+        dialog_path = Path(config.dialog_path) / language
+        if config.lazy_dialogs:
+            # validation is left to the build (see hooks/hook_compile.py)
+            return LazyDialogs.open(dialog_path, config.node_cache_size)
 
         # TODO: function here to translate text
-        return dialog_map
+        return cls.load_graph(dialog_path, config.jobs)
+
+
+class LazyDialogs(Mapping):
+    """
+    dialog graph that parses each node on its first visit
+    - a label -> file index tells where each node is defined, nodes of bulk
+    files (one per language) are indexed by their byte range in the file
+    - parsed nodes are kept in a bounded LRU, a miss parses a single node
+    """
+
+    INDEX_FILE = "dialogs.index"
+
+    def __init__(
+        self,
+        dialog_path: Path,
+        index: dict[str, str | list],
+        max_nodes: int = 1024,
+    ) -> None:
+        self.dialog_path = dialog_path
+        self._index = index
+        self._nodes = NodeCache(max_nodes)
+
+    @classmethod
+    def open(cls, dialog_path: Path, max_nodes: int = 1024) -> "LazyDialogs":
+        "uses the index written at build time, or builds one by scanning the files"
+        index_path = dialog_path / cls.INDEX_FILE
+        if index_path.exists():
+            with open(index_path, "r") as fp:
+                index = json.load(fp)
+        else:
+            index = cls.build_index(dialog_path)
+        return cls(dialog_path, index, max_nodes)
 
+    @staticmethod
+    def build_index(dialog_path: Path) -> dict[str, str | list]:
+        "maps each dialog label to the file (relative to dialog_path) defining it"
+        assert dialog_path.exists(), f"Dialog directory {dialog_path!r} doesn't exist"
+
+        index = {}
+        for file in LoadDialogs.scan_files(dialog_path):
+            name = str(file.relative_to(dialog_path))
+            try:
+                data = file.read_bytes()
+                if file.suffix == ".json" and data.lstrip().startswith(b"["):
+                    # [file, start, end], so a node is read without the others
+                    for dialog, start, end in iter_bulk(data):
+                        if "label" in dialog:
+                            index[dialog["label"]] = [name, start, end]
+                    continue
+            except READ_ERRORS as exp:
+                logger.error(f"Error {exp} while reading {file}")
+                continue
+
+            dialog = LoadDialogs.decode_file(file, data)
+            if dialog is not None and "label" in dialog:
+                index[dialog["label"]] = name
+        return index
+
+    @classmethod
+    def write_index(cls, dialog_path: Path) -> None:
+        "builds the index of a dialog directory and saves it along the dialogs"
+        with open(dialog_path / cls.INDEX_FILE, "w") as fp:
+            json.dump(cls.build_index(dialog_path), fp)
+
+    def read(self, label: str) -> dict | None:
+        "reads the dialog of a label, only its byte range for bulk files"
+        entry = self._index[label]
+        if isinstance(entry, str):
+            return LoadDialogs.load_file(self.dialog_path / entry)
+
+        name, start, end = entry
+        file = self.dialog_path / name
+        try:
+            with open(file, "rb") as fp:
+                fp.seek(start)
+                data = fp.read(end - start)
+        except (FileNotFoundError, PermissionError) as exp:
+            logger.error(f"Error {exp} while reading {file}")
+            return None
+        return LoadDialogs.decode_file(file, data)
+
+    def __getitem__(self, label: str) -> DialogNode:
+        node = self._nodes.get(label)
+        if node is not None:
+            return node
+
+        content = self.read(label)
+        node = LoadDialogs.parse_dialog(content) if isinstance(content, dict) else None
+        if node is None or node.label != label:
+            raise KeyError(f"Dialog {label!r} could not be loaded")
+        return self._nodes.put(label, node)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._index
+
+
+class DialogWatcher(Mapping):
+    """
+    dialog graph that follows the changes of its files on disk (authoring mode)
+    - a manifest with the mtime and content hash of each file tells what changed
+    - only changed files are parsed again, patching the graph in place
+    - only the edges of the patched nodes are validated again
+    """
+
+    def __init__(self, dialog_path: Path) -> None:
+        assert dialog_path.exists(), f"Dialog directory {dialog_path!r} doesn't exist"
+        self.dialog_path = dialog_path
+        self.dialogs: dict[str, DialogNode] = {}
+        # file -> (mtime, content hash) and file -> label defined in it
+        self._manifest: dict[Path, tuple[int, str]] = {}
+        self._labels: dict[Path, str] = {}
+        # label -> labels of the nodes with an option pointing to it
+        self._parents: defaultdict[str, set[str]] = defaultdict(set)
+        self.poll()
+
+    def _remove(self, file: Path) -> str | None:
+        label = self._labels.pop(file, None)
+        node = self.dialogs.pop(label, None)
+        for option in node.options if node else ():
+            self._parents[option.label].discard(label)
+        return label
+
+    def _add(self, file: Path, node: DialogNode) -> None:
+        self._labels[file] = node.label
+        self.dialogs[node.label] = node
+        for option in node.options:
+            self._parents[option.label].add(node.label)
+
+    def changed_files(self) -> tuple[list[Path], dict[Path, bytes]]:
+        "files removed since the last poll and content of the files that changed"
+        files = set(LoadDialogs.scan_files(self.dialog_path))
+        removed = [file for file in self._manifest if file not in files]
+        changed = {}
+        for file in files:
+            try:
+                mtime = file.stat().st_mtime_ns
+                entry = self._manifest.get(file)
+                if entry is not None and entry[0] == mtime:
+                    continue
+                data = file.read_bytes()
+            except (FileNotFoundError, PermissionError) as exp:
+                logger.error(f"Error {exp} while reading {file}")
+                continue
+
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            self._manifest[file] = (mtime, digest)
+            # touched but not modified
+            if entry is None or entry[1] != digest:
+                changed[file] = data
+        return removed, changed
+
+    def poll(self) -> set[str]:
+        "patches the graph with the files changed on disk, returns the labels affected"
+        removed, changed = self.changed_files()
+        affected = set()
+        for file in removed:
+            del self._manifest[file]
+            affected.add(self._remove(file))
+        for file, data in changed.items():
+            affected.add(self._remove(file))
+            dialog = LoadDialogs.decode_file(file, data)
+            node = LoadDialogs.parse_dialog(dialog) if dialog is not None else None
+            if node is not None:
+                self._add(file, node)
+                affected.add(node.label)
+        affected.discard(None)
+
+        if affected:
+            logger.info(f"Loaded dialogs: {sorted(affected)}")
+            # edges leaving the patched nodes and edges pointing to them
+            edges = affected.union(*(self._parents[label] for label in affected))
+            try:
+                LoadDialogs.validate_dialogs(self.dialogs, edges)
+            except Exception as exp:
+                logger.error(f"Invalid dialogs after reload: {exp}")
+        return affected
+
+    def __getitem__(self, label: str) -> DialogNode:
+        return self.dialogs[label]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.dialogs)
 
-def walk_dialog(dialogs: dict[str, DialogNode], start: str = "root") -> Generator:
+    def __len__(self) -> int:
+        return len(self.dialogs)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self.dialogs
+
+
+class LocalizedDialogs(Mapping):
+    """
+    dialog graph resident for all languages
+    - the graph topology (the set of labels) comes from the first language loaded
+    - the dialogs of each language are loaded on the first switch and kept resident,
+    so switching back and forth only swaps the active lookup table
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self._tables: dict[str, Mapping[str, DialogNode]] = {}
+        self.language = config.language
+        self._topology = self._active = self.table(config.language)
+        self._labels: list[str] | None = None
+
+    @property
+    def labels(self) -> list[str]:
+        "sorted labels of the graph, the index of a label is its node id"
+        if self._labels is None:
+            self._labels = sorted(self._topology)
+        return self._labels
+
+    def table(self, language: str) -> Mapping[str, DialogNode]:
+        "dialogs of a language, loading them on the first use"
+        if language not in self._tables:
+            table = LoadDialogs.run(self.config, language)
+            # translations are expected to keep the same graph
+            if self._tables and table.keys() != self._topology.keys():
+                logger.error(f"Dialog graph of {language!r} differs from the default")
+            self._tables[language] = table
+        return self._tables[language]
+
+    def set_language(self, language: str) -> None:
+        "swaps the active language"
+        self._active = self.table(language)
+        self.language = language
+
+    def poll(self) -> set[str]:
+        "reloads changed dialog files when in watch mode, returns the labels affected"
+        if not isinstance(self._active, DialogWatcher):
+            return set()
+        affected = self._active.poll()
+        if affected:
+            self._labels = None
+        return affected
+
+    def __getitem__(self, label: str) -> DialogNode:
+        return self._active[label]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._topology)
+
+    def __len__(self) -> int:
+        return len(self._topology)
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._topology
+
+
+def walk_dialog(
+    dialogs: Mapping[str, DialogNode], start: str = "root", breadcrumbs: list = None
+) -> Generator:
     "genrator that walks the dialog graph, given a next node to visit if yield the node and the walinkg history"
-    current, breadcrumbs = start, []
+    current, breadcrumbs = start, [] if breadcrumbs is None else breadcrumbs
     while True:
         node = dialogs[current]
         breadcrumbs.append(current)
@@ -128,24 +499,25 @@ class DialogFacade:
     "encapsulates the dialog graph behavior"
 
     def __init__(self, config, start="root"):
-        self._dialogs = LoadDialogs.run(config)
-        self._walker = walk_dialog(self._dialogs, start)
+        self._dialogs = LocalizedDialogs(config)
+        self._history_limit = config.history_limit
+        self._walker = walk_dialog(self._dialogs, start, self.new_history())
         self._current, self._history = next(self._walker)
 
     def next(self, option: str) -> DialogNode:
         "choose an option and go to the next dialog node"
         self._current, self._history = self._walker.send(option)
-        return deepcopy(self._current)
+        return self._current
 
     @property
     def current(self) -> DialogNode:
         "get current node"
-        return deepcopy(self._current)
+        return self._current
 
     @property
-    def history(self) -> tuple[str]:
-        "get history of nodes visited"
-        return tuple(self._history)
+    def history(self) -> History:
+        "get history of nodes visited, should not be modified"
+        return self._history
 
     @property
     def current_text(self) -> str:
@@ -156,20 +528,91 @@ class DialogFacade:
         return self._current.image
 
     @property
-    def current_options(self) -> list[DialogOption]:
-        return deepcopy(self._current.options)
+    def current_options(self) -> tuple[DialogOption, ...]:
+        return self._current.options
+
+    def peek(self, label: str) -> DialogNode | None:
+        "dialog node of a label without moving to it, None if it can't be loaded"
+        return self._dialogs.get(label)
+
+    def new_history(self, labels: Iterable[str] = ()) -> History:
+        return History(labels, maxlen=self._history_limit)
 
     def reset(self) -> None:
         "reset the dialog to the starting position"
-        self._walker = walk_dialog(self._dialogs)
+        self._walker = walk_dialog(self._dialogs, "root", self.new_history())
         self._current, self._history = next(self._walker)
 
-    def load(self, history: list[str]) -> None:
+    def back(self) -> DialogNode:
+        "go back to the previous dialog node"
+        if len(self._history) > 1:
+            self._history.pop()
+            self._resume(self._history)
+        return self._current
+
+    def dump(self) -> dict:
+        "compact save of the current position and of the history"
+        return encode_save(self._dialogs.labels, self._current.label, self._history)
+
+    def load(self, save: dict | list[str], verify: bool = False) -> None:
+        "jump to a saved position, checking the saved path follows the dialog options if verify is set"
+        if isinstance(save, list):
+            # older saves are the list of visited labels
+            return self.replay(save)
+
+        labels = self._dialogs.labels
+        try:
+            current, history = decode_save(labels, save, self._history_limit)
+        except (ValueError, KeyError) as exp:
+            logger.error(f"Error {exp} while loading save, restoring its current node")
+            current, history = save.get("current"), self.new_history(
+                [save.get("current")]
+            )
+
+        invalid = current not in self._dialogs or history.last != current
+        if invalid or (verify and not self.is_valid_path(history)):
+            logger.error(f"Invalid saved dialog path {history}, starting a new game")
+            return self.reset()
+        self._resume(history)
+
+    def replay(self, history: list[str]) -> None:
         "reset game state and advance it using history"
         self.reset()
         for label in history[1:]:
             self.next(label)
 
+    def is_valid_path(self, path: Iterable[str]) -> bool:
+        "checks that each node of a path is an option of the previous one"
+        labels = list(path)
+        if not labels or any(label not in self._dialogs for label in labels):
+            return False
+        return all(
+            any(option.label == label for option in self._dialogs[previous].options)
+            for previous, label in pairwise(labels)
+        )
+
+    def _resume(self, history: History) -> None:
+        "continue the walk from the last node of a history"
+        current = history.pop()
+        self._walker = walk_dialog(self._dialogs, current, history)
+        self._current, self._history = next(self._walker)
+
+    def poll_changes(self) -> bool:
+        "applies dialog files changed on disk (watch mode), returns True if any changed"
+        if not self._dialogs.poll():
+            return False
+
+        # resume the walk from the same position, using the patched nodes
+        if self._current.label in self._dialogs:
+            self._resume(self._history)
+        else:
+            self.reset()
+        return True
+
     def reload_config(self, config: Config) -> None:
-        "reload config - used to change language setting"
-        self.__init__(config)
+        "reload config - used to change language setting, keeps the dialog position"
+        self._dialogs.set_language(config.language)
+        if self._current.label in self._dialogs:
+            self._current = self._dialogs[self._current.label]
+        else:
+            self.reset()
@@ -0,0 +1,127 @@
+from collections import deque
+from itertools import islice, repeat
+from typing import Iterable, Iterator
+
+
+class History:
+    """
+    sequence of visited dialog labels, compressed as runs of repeated cycles
+    - each entry is a pattern of labels and how many times it was repeated in a
+    row, e.g. esperar -> esperar -> esperar is stored as ((esperar,), 3)
+    - cycles of up to max_period nodes are folded as they are appended
+    - maxlen (optional) keeps only the most recent labels, like a ring buffer
+    - append, pop and last are O(1)
+    """
+
+    def __init__(
+        self, labels: Iterable[str] = (), maxlen: int = None, max_period: int = 4
+    ) -> None:
+        self.maxlen = maxlen
+        self.max_period = max_period
+        self._entries: deque[list] = deque()
+        self._len = 0
+        for label in labels:
+            self.append(label)
+
+    @classmethod
+    def from_entries(
+        cls, entries: Iterable[tuple[tuple[str, ...], int]], **kwargs
+    ) -> "History":
+        "rebuilds a history from the entries of another one"
+        history = cls(**kwargs)
+        for pattern, count in entries:
+            history._entries.append([tuple(pattern), count])
+            history._len += len(pattern) * count
+        history._trim()
+        return history
+
+    @property
+    def entries(self) -> list[tuple[tuple[str, ...], int]]:
+        "compressed representation, a list of (pattern, repetitions)"
+        return [(pattern, count) for pattern, count in self._entries]
+
+    @property
+    def last(self) -> str:
+        "last label visited"
+        return self._entries[-1][0][-1]
+
+    def append(self, label: str) -> None:
+        "adds a label, folding it into the last run when it continues a cycle"
+        self._entries.append([(label,), 1])
+        self._len += 1
+        self._fold()
+        self._trim()
+
+    def pop(self) -> str:
+        "removes and returns the last label"
+        pattern, count = self._entries.pop()
+        if count > 1:
+            self._entries.append([pattern, count - 1])
+        # the start of the last repetition is kept as single labels
+        self._entries.extend([(label,), 1] for label in pattern[:-1])
+        self._len -= 1
+        return pattern[-1]
+
+    def _single_labels(self, n: int, end: int) -> tuple[str, ...] | None:
+        "labels of the n entries before index end, if all of them are single labels"
+        labels = []
+        # indexing close to the end of a deque is O(1)
+        for i in range(end - n, end):
+            pattern, count = self._entries[i]
+            if count != 1 or len(pattern) != 1:
+                return None
+            labels.append(pattern[0])
+        return tuple(labels)
+
+    def _fold(self) -> None:
+        "compresses the tail when it repeats the previous run or itself"
+        entries = self._entries
+        for period in range(1, self.max_period + 1):
+            if len(entries) <= period:
+                return
+            tail = self._single_labels(period, len(entries))
+            if tail is None:
+                return
+            # tail continues the run before it
+            if entries[-period - 1][0] == tail:
+                for _ in range(period):
+                    entries.pop()
+                entries[-1][1] += 1
+                return
+            # tail is repeated twice in a row
+            if len(entries) >= 2 * period:
+                if self._single_labels(period, len(entries) - period) == tail:
+                    for _ in range(2 * period):
+                        entries.pop()
+                    entries.append([tail, 2])
+                    return
+
+    def _trim(self) -> None:
+        "drops the oldest labels above maxlen"
+        while self.maxlen is not None and self._len > self.maxlen:
+            pattern, count = self._entries.popleft()
+            # keep the remaining repetitions and the end of the dropped one
+            if count > 1:
+                self._entries.appendleft([pattern, count - 1])
+            self._entries.extendleft([(label,), 1] for label in reversed(pattern[1:]))
+            self._len -= 1
+
+    def tail(self, n: int) -> list[str]:
+        "last n labels, oldest first, without expanding the whole history"
+        return list(islice(reversed(self), n))[::-1]
+
+    def __iter__(self) -> Iterator[str]:
+        for pattern, count in self._entries:
+            for _ in repeat(None, count):
+                yield from pattern
+
+    def __reversed__(self) -> Iterator[str]:
+        for pattern, count in reversed(self._entries):
+            for _ in repeat(None, count):
+                yield from reversed(pattern)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"History({self.entries!r})"
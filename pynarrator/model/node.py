@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+
+@dataclass(frozen=True, slots=True)
+class DialogNode:
+    "represent an in game dialog, immutable so it can be shared without copies"
+
+    label: str
+    text: str
+    image: str
+
+    options: tuple["DialogOption", ...] = ()
+
+    def __post_init__(self) -> None:
+        # accept any iterable of options, but always store a tuple
+        object.__setattr__(self, "options", tuple(self.options))
+
+    def __str__(self) -> str:
+        opts = "\n\t".join(map(str, self.options))
+        return f"[DIALOG {self.label!r}]:\n{self.text}\n\t{opts}"
+
+
+@dataclass(frozen=True, slots=True)
+class DialogOption:
+    "represent an option of a given dialog"
+
+    label: str
+    text: str
+
+    def __str__(self) -> str:
+        return f"<OPTION : {self.label!r}>: {self.text}"
+
+
+class NodeCache:
+    "bounded LRU of decoded dialog nodes, shared with the prefetch thread"
+
+    def __init__(self, max_nodes: int) -> None:
+        self.max_nodes = max_nodes
+        self._nodes: OrderedDict[Hashable, DialogNode] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> DialogNode | None:
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None:
+                self._nodes.move_to_end(key)
+            return node
+
+    def put(self, key: Hashable, node: DialogNode) -> DialogNode:
+        with self._lock:
+            self._nodes[key] = node
+            while len(self._nodes) > self.max_nodes:
+                self._nodes.popitem(last=False)
+            return node
+
+    def clear(self) -> None:
+        with self._lock:
+            self._nodes.clear()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
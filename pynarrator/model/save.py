@@ -0,0 +1,88 @@
+import base64
+import hashlib
+from collections.abc import Iterable
+
+from model.history import History
+
+# save file format, a json object with:
+#   version   save format version
+#   graph     checksum of the dialog labels, node ids are only valid for this graph
+#   current   label of the current dialog node
+#   history   base64 varint encoded runs of the history (see model.history),
+#             each run is: repetitions, pattern length, node id of each label
+# a node id is the index of its label in the sorted list of labels
+SAVE_VERSION = 3
+
+
+def graph_checksum(labels: Iterable[str]) -> str:
+    "checksum of the sorted dialog labels, changes whenever node ids change"
+    digest = hashlib.blake2b(digest_size=8)
+    for label in labels:
+        digest.update(label.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def encode_varints(values: Iterable[int]) -> bytes:
+    "encodes non negative integers using 7 bits per byte (LEB128)"
+    data = bytearray()
+    for value in values:
+        while value > 0x7F:
+            data.append((value & 0x7F) | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def decode_varints(data: bytes) -> list[int]:
+    "decodes integers encoded by encode_varints"
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            values.append(value)
+            value, shift = 0, 0
+    if shift:
+        raise ValueError("Truncated varint data")
+    return values
+
+
+def encode_save(labels: list[str], current: str, history: History) -> dict:
+    "builds a save for the given position, labels are the sorted dialog labels"
+    ids = {label: i for i, label in enumerate(labels)}
+    values = []
+    for pattern, count in history.entries:
+        values += [count, len(pattern), *(ids[label] for label in pattern)]
+    return {
+        "version": SAVE_VERSION,
+        "graph": graph_checksum(labels),
+        "current": current,
+        "history": base64.b64encode(encode_varints(values)).decode("ascii"),
+    }
+
+
+def decode_save(
+    labels: list[str], save: dict, maxlen: int = None
+) -> tuple[str, History]:
+    "returns the current label and the history of a save made for the same graph"
+    version = save.get("version")
+    if version not in (2, SAVE_VERSION):
+        raise ValueError(f"Unsupported save version {version!r}")
+    if save["graph"] != graph_checksum(labels):
+        raise ValueError("Save was made for a different dialog graph")
+
+    values = decode_varints(base64.b64decode(save["history"]))
+    try:
+        if version == 2:
+            # flat ids of the nodes visited before the current one
+            path = [labels[i] for i in values] + [save["current"]]
+            return save["current"], History(path, maxlen=maxlen)
+
+        entries, values = [], iter(values)
+        for count in values:
+            size = next(values)
+            pattern = tuple(labels[next(values)] for _ in range(size))
+            entries.append((pattern, count))
+    except (IndexError, StopIteration):
+        raise ValueError("Save history has unknown node ids")
+    return save["current"], History.from_entries(entries, maxlen=maxlen)
@@ -0,0 +1,115 @@
+import json
+import time
+from pathlib import Path
+
+from config import Config
+from logger import get_logger
+from model.autosave import Autosave
+
+logger = get_logger()
+
+
+class SaveSlots:
+    """
+    fixed number of save slots, written in the background by an Autosave
+    - the metadata of every slot (time, dialog node, player and language) is kept
+    in a single index file, so slots can be listed without opening each save
+    - the single save of older versions (LEGACY_FILE) is moved to a slot
+    """
+
+    INDEX_FILE = "index.json"
+    LEGACY_FILE = "save.json"
+
+    def __init__(self, save_path: Path, slots: int, autosave: Autosave) -> None:
+        self.save_path = save_path
+        self.slots = slots
+        self.autosave = autosave
+        self.index: dict[str, dict] = autosave.load(self.index_path) or {}
+
+    @property
+    def index_path(self) -> Path:
+        return self.save_path / self.INDEX_FILE
+
+    def slot_path(self, slot: int) -> Path:
+        return self.save_path / f"slot_{slot}.json"
+
+    def metadata(self, slot: int) -> dict | None:
+        "metadata of a slot, None if it is empty"
+        return self.index.get(str(slot))
+
+    def free_slot(self) -> int:
+        "first empty slot, or the one saved the longest time ago"
+        for slot in range(self.slots):
+            if self.metadata(slot) is None:
+                return slot
+        return min(range(self.slots), key=lambda slot: self.metadata(slot)["timestamp"])
+
+    def save(
+        self,
+        slot: int,
+        save: dict | list,
+        label: str,
+        player: str,
+        language: str,
+        timestamp: float | None = None,
+    ) -> None:
+        "schedules the write of a slot and of the updated index"
+        self.index = {
+            **self.index,
+            str(slot): {
+                "timestamp": time.time() if timestamp is None else timestamp,
+                "label": label,
+                "player": player,
+                "language": language,
+            },
+        }
+        self.autosave.save(self.slot_path(slot), save)
+        self.autosave.save(self.index_path, self.index)
+
+    def migrate_legacy(self, language: str) -> int | None:
+        "moves the save of older versions to a free slot, returns the slot used"
+        legacy = self.save_path / self.LEGACY_FILE
+        if not legacy.exists():
+            return None
+        try:
+            with open(legacy, "r") as fp:
+                save = json.load(fp)
+        except (json.JSONDecodeError, OSError) as exp:
+            logger.error(f"Error {exp} while reading old save {legacy}")
+            return None
+
+        # the first saves are the list of visited labels, later ones a dict
+        if isinstance(save, list):
+            label = save[-1] if save else None
+        else:
+            label = save.get("current")
+        slot = self.free_slot()
+        # the player name was not saved, the language is the configured one
+        self.save(slot, save, label, "", language, legacy.stat().st_mtime)
+        # kept aside instead of deleted, in case the slot is overwritten
+        legacy.rename(legacy.with_name(legacy.name + ".bak"))
+        logger.info(f"Moved old save {legacy} to slot {slot}")
+        return slot
+
+    def load(self, slot: int) -> dict | list | None:
+        "reads a single slot"
+        if self.metadata(slot) is None:
+            return None
+        return self.autosave.load(self.slot_path(slot))
+
+    def close(self) -> None:
+        self.autosave.close()
+
+
+_save_slots: SaveSlots | None = None
+
+
+def get_save_slots(config: Config) -> SaveSlots:
+    "returns the save slots shared by all controllers, starting the autosave on the first call"
+    global _save_slots
+    if _save_slots is None:
+        autosave = Autosave(config.autosave_interval)
+        Path(config.save_path).mkdir(parents=True, exist_ok=True)
+        _save_slots = SaveSlots(Path(config.save_path), config.save_slots, autosave)
+        _save_slots.migrate_legacy(config.language)
+    return _save_slots
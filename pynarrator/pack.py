@@ -0,0 +1,97 @@
+import json
+import mmap
+import struct
+from functools import lru_cache
+from pathlib import Path
+
+# single file asset archive, all integers are little endian
+#   header  magic, version, index size
+#   index   utf-8 json: {"languages": [...], "entries": {name: [offset, size]}}
+#   data    the blobs, offsets are relative to the start of the data
+# entries are named "dialogs/<language>/dialogs.bin" and "images/<file name>"
+MAGIC = b"PYNP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHI")
+
+PACK_FILE = "assets.pack"
+
+# compiled dialog graph of a language (see model/compiled.py), kept here so the
+# build hooks can name it without importing the game model
+COMPILED_FILE = "dialogs.bin"
+
+
+def compiled_path(dialog_path: str | Path, language: str) -> Path:
+    "path of the compiled dialog graph of a language"
+    return Path(dialog_path) / language / COMPILED_FILE
+
+
+def dialog_entry(language: str) -> str:
+    return f"dialogs/{language}/{COMPILED_FILE}"
+
+
+def image_entry(name: str) -> str:
+    return f"images/{name}"
+
+
+def write_pack(path: str | Path, languages: list[str], files: dict[str, Path]) -> None:
+    "writes the files (entry name -> file on disk) in a single archive"
+    entries, offset = {}, 0
+    for name, file in files.items():
+        size = file.stat().st_size
+        entries[name] = [offset, size]
+        offset += size
+    index = json.dumps({"languages": languages, "entries": entries}).encode("utf-8")
+
+    with open(path, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        fp.write(index)
+        for file in files.values():
+            fp.write(file.read_bytes())
+
+
+class AssetPack:
+    """
+    read only view of an asset archive, memory mapped instead of extracted
+    - blobs are returned as memoryviews over the mapping, nothing is copied
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap) -> None:
+        self._buffer = memoryview(buffer)
+        magic, version, index_size = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported asset pack (magic {magic}, v{version})")
+
+        index = json.loads(bytes(self._buffer[HEADER.size : HEADER.size + index_size]))
+        self.languages: list[str] = index["languages"]
+        self._entries: dict[str, list[int]] = index["entries"]
+        self._data = HEADER.size + index_size
+
+    @classmethod
+    def open(cls, path: str | Path) -> "AssetPack":
+        with open(path, "rb") as fp:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def read(self, name: str) -> memoryview:
+        "contents of an entry, raises KeyError if it is not in the pack"
+        offset, size = self._entries[name]
+        start = self._data + offset
+        return self._buffer[start : start + size]
+
+    def names(self) -> list[str]:
+        return list(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache(maxsize=None)
+def get_asset_pack(path: str | None) -> AssetPack | None:
+    "opens (once) the asset pack at path, None if there is no pack"
+    if path is None or not Path(path).exists():
+        return None
+    return AssetPack.open(path)
@@ -0,0 +1,76 @@
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+# sqlite has a limit on the number of parameters of a query
+QUERY_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TranslationMemory:
+    """
+    persistent store of translated strings, so rebuilds only translate new text
+    - entries are keyed by (source text hash, source language, target language, backend)
+    - hits and misses are counted for the build report
+    - not thread safe, lookups and stores should happen on the thread that created it
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " hash TEXT, source TEXT, target TEXT, backend TEXT, translation TEXT,"
+                " PRIMARY KEY (hash, source, target, backend))"
+            )
+
+    def lookup(
+        self, texts: Iterable[str], source: str, target: str, backend: str
+    ) -> dict[str, str]:
+        "translations already in memory (text -> translation), counting hits and misses"
+        hashes = {text_hash(text): text for text in dict.fromkeys(texts)}
+        found = {}
+        keys = list(hashes)
+        for i in range(0, len(keys), QUERY_CHUNK):
+            chunk = keys[i : i + QUERY_CHUNK]
+            rows = self._db.execute(
+                "SELECT hash, translation FROM translations"
+                " WHERE source = ? AND target = ? AND backend = ?"
+                f" AND hash IN ({', '.join('?' * len(chunk))})",
+                (source, target, backend, *chunk),
+            )
+            found.update((hashes[key], translation) for key, translation in rows)
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        return found
+
+    def store(
+        self, translations: dict[str, str], source: str, target: str, backend: str
+    ) -> None:
+        "saves new translations (text -> translation)"
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                (
+                    (text_hash(text), source, target, backend, translation)
+                    for text, translation in translations.items()
+                ),
+            )
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"Translation memory: {self.hits} hits, {self.misses} misses"
+            f" ({rate:.0%} reused)"
+        )
+
+    def close(self) -> None:
+        self._db.close()
@@ -1,10 +1,9 @@
-import pygame
-
-# Initialize Pygame
-pygame.init()
-
 from view.base import *
+from view.cache import *
 from view.game import *
 from view.language_menu import *
+from view.layout import *
 from view.menu import *
 from view.name_screen import *
+from view.prefetch import *
+from view.slot_menu import *
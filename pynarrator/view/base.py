@@ -3,6 +3,8 @@ from pathlib import Path
 import pygame
 from config import Config
 from model import DialogFacade
+from view.cache import Frame, TextCache, get_font, get_image_cache
+from view.layout import get_text_layout
 
 # Colors
 BLACK = (0, 0, 0)
@@ -10,12 +12,25 @@ GREY = (200, 200, 200)
 RED = (255, 0, 0)
 WHITE = (255, 255, 255)
 
-FONT_BIG = pygame.font.Font(None, 30)
-FONT_MEDIUM = pygame.font.Font(None, 26)
+# font sizes, fonts are loaded on the first view (see get_font)
+FONT_BIG = 30
+FONT_MEDIUM = 26
+
+# text boxes: padding around the text and margin to the screen border
+TITLE_PADDING = 15
+OPTION_PADDING = 10
+TEXT_MARGIN = 20
+# distance between the centers of single line options
+OPTION_SPACING = 50
 
 
 class BaseView:
-    "a base class for game views / game scrrens, providing common functionality and interface"
+    """
+    a base class for game views / game scrrens, providing common functionality and interface
+    - render only redraws what changed and returns the screen regions to update
+    - a full redraw happens after invalidate() (e.g. state or dialog node change),
+    it blits the frame (see compose) and the hovered option over it
+    """
 
     DEFAULT_IMAGE = "start_screen.png"
 
@@ -26,17 +41,29 @@ class BaseView:
 
         # initialize screen variables
         self.background_image_path = str(Path(config.image_path) / self.DEFAULT_IMAGE)
-        self.fontTitle = FONT_BIG
-        self.font = FONT_MEDIUM
+        self.fontTitle = get_font(FONT_BIG)
+        self.font = get_font(FONT_MEDIUM)
+        self.text_cache = TextCache()
+        self.layout = get_text_layout()
 
         # set background
         self.screen_width, self.screen_height = config.width, config.height
-        self.background_image = pygame.image.load(self.background_image_path)
-        self.background_image = pygame.transform.scale(
-            self.background_image, (self.screen_width, self.screen_height)
+        self.image_cache = get_image_cache(config)
+        self.background_image = self.image_cache.get(
+            self.background_image_path, (self.screen_width, self.screen_height)
         )
-        # clickable rectangles
+        # clickable rectangles and the boxes drawn around them
         self.option_rects: list = []
+        self.option_boxes: list = []
+
+        # dirty rectangle tracking
+        self.needs_redraw = True
+        self.dirty_rects: list[pygame.Rect] = []
+        self.dirty_options: set[int] = set()
+        self.drawn_text: str | None = None
+        self.text_rect: pygame.Rect | None = None
+        self.current_frame: Frame | None = None
+        self.hovered: int | None = None
 
         # defaults
         self.text = ""
@@ -46,39 +73,175 @@ class BaseView:
         "changes screen variables base on game state"
         pass
 
-    def draw_text(self) -> None:
-        "draw central text (e.g title or main dialog)"
-        # TODO: use a function that wrap lines
-        # draw text
-        text_render = self.fontTitle.render(self.text, True, WHITE)
-        rect = text_render.get_rect(center=(self.screen_width / 2, 50))
-        # draw text box
-        background_rect = rect.inflate(15, 15)
-        pygame.draw.rect(self.screen, BLACK, background_rect)
-        # render
-        self.screen.blit(text_render, rect)
-
-    def draw_choises(self, text: str, position: tuple[int, int]):
-        "draw clickable options in the game screen"
-        # draw text
-        text_render = self.font.render(text, True, WHITE)
-        rect = text_render.get_rect(center=position)
-        # draw text box
-        background_rect = rect.inflate(10, 10)
-        pygame.draw.rect(self.screen, BLACK, background_rect)
-        # render
-        self.screen.blit(text_render, rect)
+    def close(self) -> None:
+        "stops background work of the view, called when the game exits"
+        pass
+
+    def invalidate(self) -> None:
+        "forces a full redraw on the next render"
+        self.needs_redraw = True
+
+    def hover(self, position: tuple[int, int]) -> None:
+        "highlights the option under the mouse, marking the affected options as dirty"
+        hovered = self.option_at(position)
+        if hovered != self.hovered:
+            self.dirty_options.update({self.hovered, hovered} - {None})
+            self.hovered = hovered
+
+    def option_at(self, position: tuple[int, int]) -> int | None:
+        "index of the option under the given position"
+        for i, rect in enumerate(self.option_rects):
+            if rect.collidepoint(position):
+                return i
+        return None
+
+    def wrap(self, font: pygame.font.Font, text: str, padding: int) -> tuple[str, ...]:
+        "lines of a text box that fits the screen width"
+        width = self.screen_width - 2 * TEXT_MARGIN - padding
+        return self.layout.wrap(font, text, width)
+
+    def option_layout(self) -> list[tuple[str, tuple[int, int]]]:
+        "text and center position of each clickable option, stacked below the text"
+        x = int(self.screen_width / 2)
+        # single line options are OPTION_SPACING apart, a wrapped option pushes
+        # the next ones down by its extra lines
+        extras = [
+            (len(self.wrap(self.font, option, OPTION_PADDING)) - 1)
+            * self.font.get_linesize()
+            for option in self.options
+        ]
+        # below the central text, even when it wraps
+        line = self.font.get_linesize() + OPTION_PADDING
+        top = self.text_box_rect().bottom + OPTION_SPACING - line
+        y = max(250, top + (line + (extras[0] if extras else 0)) // 2)
+
+        layout = []
+        for i, option in enumerate(self.options):
+            layout.append((option, (x, y)))
+            if i + 1 < len(extras):
+                y += OPTION_SPACING + (extras[i] + extras[i + 1]) // 2
+        return layout
+
+    def text_center(self) -> tuple[float, float]:
+        "center position of the central text (of its first line if wrapped)"
+        return (self.screen_width / 2, 50)
+
+    def text_box_rect(self) -> pygame.Rect:
+        "screen region of the central text box, extra lines grow downwards"
+        lines = self.wrap(self.fontTitle, self.text, TITLE_PADDING)
+        sizes = [self.fontTitle.size(line) for line in lines]
+        rect = pygame.Rect(
+            0,
+            0,
+            max(w for w, _ in sizes) + TITLE_PADDING,
+            sum(h for _, h in sizes) + TITLE_PADDING,
+        )
+        x, y = self.text_center()
+        first = pygame.Rect(0, 0, 0, sizes[0][1] + TITLE_PADDING)
+        first.center = (x, y)
+        rect.midtop = (first.centerx, first.top)
         return rect
 
-    def render(self) -> None:
-        "draws all text the is display in the screen"
-        self.screen.blit(self.background_image, (0, 0))
+    def draw_text(self, surface: pygame.Surface = None) -> pygame.Rect:
+        "draw central text (e.g title or main dialog), on the screen by default"
+        lines = self.wrap(self.fontTitle, self.text, TITLE_PADDING)
+        # draw text over its box
+        box = self.text_cache.render_lines_box(
+            self.fontTitle, lines, WHITE, BLACK, TITLE_PADDING
+        )
+        rect = box.get_rect(topleft=self.text_box_rect().topleft)
+        (self.screen if surface is None else surface).blit(box, rect)
+        return rect
 
+    def draw_choises(
+        self,
+        text: str,
+        position: tuple[int, int],
+        hovered: bool = False,
+        surface: pygame.Surface = None,
+    ) -> pygame.Rect:
+        "draw clickable options in the game screen, on the screen by default"
+        # draw text over its box
+        colors = (BLACK, GREY) if hovered else (WHITE, BLACK)
+        lines = self.wrap(self.font, text, OPTION_PADDING)
+        box = self.text_cache.render_lines_box(
+            self.font, lines, *colors, OPTION_PADDING
+        )
+        background_rect = box.get_rect(center=position)
+        (self.screen if surface is None else surface).blit(box, background_rect)
+        return background_rect
+
+    def restore_background(self, rect: pygame.Rect) -> None:
+        "paints the background image over a screen region"
+        self.screen.blit(self.background_image, rect, rect)
+
+    def compose(self) -> Frame:
+        "draws the background, text and options (not hovered) in a new surface"
+        # same pixel format as the screen, so blitting it is a plain copy
+        surface = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        surface.blit(self.background_image, (0, 0))
+        text_rect = self.draw_text(surface)
+
+        boxes = tuple(
+            self.draw_choises(text, position, surface=surface)
+            for text, position in self.option_layout()
+        )
+        # only the text area is clickable
+        rects = tuple(box.inflate(-10, -10) for box in boxes)
+        return Frame(surface, text_rect, boxes, rects)
+
+    def frame(self) -> Frame:
+        "composed frame of the current screen, views may cache it"
+        return self.compose()
+
+    def redraw(self) -> None:
+        "draws the whole screen"
+        frame = self.current_frame = self.frame()
+        self.screen.blit(frame.surface, (0, 0))
+        self.text_rect = frame.text_rect
+        self.drawn_text = self.text
+        self.option_boxes = list(frame.option_boxes)
+        self.option_rects = list(frame.option_rects)
+
+        # highlight the option that is under the mouse
+        self.hovered = self.option_at(pygame.mouse.get_pos())
+        if self.hovered is not None:
+            self.draw_choises(*self.option_layout()[self.hovered], hovered=True)
+
+        self.needs_redraw = False
+        self.dirty_options.clear()
+        self.dirty_rects = [self.screen.get_rect()]
+
+    def redraw_text(self) -> None:
+        "redraws the central text when it changed since the last render"
+        if self.text == self.drawn_text:
+            return
+        self.restore_background(self.text_rect)
+        rect = self.draw_text()
+        self.dirty_rects.append(rect.union(self.text_rect))
+        self.text_rect, self.drawn_text = rect, self.text
+
+    def redraw_options(self) -> None:
+        "redraws options whose hover state changed"
+        layout = self.option_layout()
+        for i in sorted(self.dirty_options):
+            box = self.option_boxes[i]
+            # the frame has the option as drawn when it is not hovered
+            self.screen.blit(self.current_frame.surface, box, box)
+            if i == self.hovered:
+                self.draw_choises(*layout[i], hovered=True)
+            self.dirty_rects.append(box)
+        self.dirty_options.clear()
+
+    def render(self) -> list[pygame.Rect]:
+        "draws what changed in the screen and returns the regions that need an update"
         self.update_text()
-        self.draw_text()
 
-        # created clickable rectangles in a loop
-        self.option_rects.clear()
-        for i, option in enumerate(self.options):
-            rect = self.draw_choises(option, (int(self.screen_width / 2), 250 + i * 50))
-            self.option_rects.append(rect)
+        if self.needs_redraw or not self.config.dirty_rects:
+            self.redraw()
+        else:
+            self.redraw_text()
+            self.redraw_options()
+
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        return dirty_rects
@@ -0,0 +1,288 @@
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import pygame
+from config import Config
+from logger import get_logger
+from pack import AssetPack, get_asset_pack, image_entry
+
+logger = get_logger()
+
+
+class ImageCache:
+    """
+    LRU cache of decoded and scaled images, keyed by image path and target size
+    - surfaces are converted to the display pixel format when a display is set,
+    images loaded with convert=False (e.g. by the prefetch thread, SDL conversions
+    are not thread safe) are converted by the first get on the main thread
+    - entries are evicted (least recently used first) once max_bytes is exceeded
+    - images found in the asset pack (if any) are decoded from it instead of the disk
+    - thread safe, images are decoded outside the lock and an image requested while
+    another thread decodes it is waited for instead of decoded twice
+    """
+
+    def __init__(self, max_bytes: int, pack: AssetPack | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.pack = pack
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self._loading: dict[tuple, threading.Event] = {}
+        self._unconverted: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def surface_bytes(surface: pygame.Surface) -> int:
+        "memory used by the pixel buffer of a surface"
+        return surface.get_pitch() * surface.get_height()
+
+    @staticmethod
+    def load_surface(
+        path: str,
+        size: tuple[int, int],
+        pack: AssetPack | None = None,
+        convert: bool = True,
+    ) -> pygame.Surface:
+        "reads an image from disk, scales it and converts it to the display format"
+        name = Path(path).name
+        if pack is not None and image_entry(name) in pack:
+            # the file name is a hint for the decoder
+            surface = pygame.image.load(io.BytesIO(pack.read(image_entry(name))), name)
+        else:
+            surface = pygame.image.load(path)
+        # images resized at build time to the window size are used as they are
+        if surface.get_size() != tuple(size):
+            surface = pygame.transform.scale(surface, size)
+        if convert and pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def get(
+        self, path: str, size: tuple[int, int], convert: bool = True
+    ) -> pygame.Surface:
+        "returns the scaled image, only touching the disk on a cache miss"
+        key = (path, tuple(size))
+        while True:
+            with self._lock:
+                surface = self._surfaces.get(key)
+                if surface is not None:
+                    self.hits += 1
+                    self._surfaces.move_to_end(key)
+                    if convert and key in self._unconverted:
+                        break
+                    return surface
+                loading = self._loading.get(key)
+                if loading is None:
+                    self.misses += 1
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # being decoded by another thread (e.g. the prefetcher)
+            loading.wait()
+
+        if surface is not None:
+            return self.convert(key, surface)
+
+        try:
+            surface = self.load_surface(path, key[1], self.pack, convert)
+            with self._lock:
+                self._surfaces[key] = surface
+                self.size_bytes += self.surface_bytes(surface)
+                if not convert:
+                    self._unconverted.add(key)
+                self.evict()
+            return surface
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def convert(self, key: tuple, surface: pygame.Surface) -> pygame.Surface:
+        "converts a surface cached with convert=False, only called from the main thread"
+        with self._lock:
+            self._unconverted.discard(key)
+        if pygame.display.get_surface() is None:
+            return surface
+        converted = surface.convert()
+        with self._lock:
+            # unless it was evicted in the meantime
+            if self._surfaces.get(key) is surface:
+                self._surfaces[key] = converted
+                self.size_bytes += self.surface_bytes(converted)
+                self.size_bytes -= self.surface_bytes(surface)
+        return converted
+
+    def evict(self) -> None:
+        "drops least recently used surfaces until the cache fits in its budget, lock must be held"
+        # always keep the most recent entry, even if it is bigger than the budget
+        while self.size_bytes > self.max_bytes and len(self._surfaces) > 1:
+            key, surface = self._surfaces.popitem(last=False)
+            self.size_bytes -= self.surface_bytes(surface)
+            self._unconverted.discard(key)
+            logger.debug(f"evicted image {key} from cache")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._surfaces.clear()
+            self._unconverted.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._surfaces
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces, keyed by font, text, color and antialias
+    - text boxes (text blitted over a solid background) are cached as a single surface
+    - owners should clear it when the displayed content changes (node or language)
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def _lookup(self, key: tuple) -> pygame.Surface | None:
+        surface = self._surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def _store(self, key: tuple, surface: pygame.Surface) -> pygame.Surface:
+        self._surfaces[key] = surface
+        while len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: tuple, antialias: bool = True
+    ) -> pygame.Surface:
+        "returns the rasterized text, only calling font.render on a cache miss"
+        key = (font, text, color, antialias)
+        surface = self._lookup(key)
+        if surface is None:
+            surface = self._store(key, font.render(text, antialias, color))
+        return surface
+
+    def render_box(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        color: tuple,
+        background: tuple,
+        padding: int,
+        antialias: bool = True,
+    ) -> pygame.Surface:
+        "returns the text over a solid box, padding is added to width and height"
+        return self.render_lines_box(
+            font, (text,), color, background, padding, antialias
+        )
+
+    def render_lines_box(
+        self,
+        font: pygame.font.Font,
+        lines: tuple[str, ...],
+        color: tuple,
+        background: tuple,
+        padding: int,
+        antialias: bool = True,
+    ) -> pygame.Surface:
+        "returns centered lines of text over a solid box (see view.layout)"
+        key = (font, lines, color, antialias, background, padding)
+        surface = self._lookup(key)
+        if surface is None:
+            renders = [self.render(font, line, color, antialias) for line in lines]
+            width = max(render.get_width() for render in renders)
+            height = sum(render.get_height() for render in renders)
+            surface = pygame.Surface((width + padding, height + padding))
+            surface.fill(background)
+            y = padding // 2
+            for render in renders:
+                surface.blit(
+                    render, (padding // 2 + (width - render.get_width()) // 2, y)
+                )
+                y += render.get_height()
+            surface = self._store(key, surface)
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+@dataclass(frozen=True)
+class Frame:
+    "static part of a screen (background, text and options) composed in a single surface"
+
+    surface: pygame.Surface
+    text_rect: pygame.Rect
+    # boxes drawn around the options and their clickable area
+    option_boxes: tuple[pygame.Rect, ...]
+    option_rects: tuple[pygame.Rect, ...]
+
+
+class FrameCache:
+    "bounded LRU of composed frames, each one holds a full screen surface"
+
+    def __init__(self, max_frames: int) -> None:
+        self.max_frames = max_frames
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[tuple, tuple] = OrderedDict()
+
+    def get(self, key: tuple, source: object) -> Frame | None:
+        "frame composed for source (e.g. a dialog node), None if missing or outdated"
+        entry = self._frames.get(key)
+        if entry is None or entry[0] != source:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._frames.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: tuple, source: object, frame: Frame) -> Frame:
+        self._frames[key] = (source, frame)
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_frames:
+            self._frames.popitem(last=False)
+        return frame
+
+    def clear(self) -> None:
+        self._frames.clear()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+_image_cache: ImageCache | None = None
+
+
+def get_image_cache(config: Config) -> ImageCache:
+    "returns the image cache shared by all views, creating it on the first call"
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache(
+            config.image_cache_bytes, get_asset_pack(config.pack_path)
+        )
+    return _image_cache
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> pygame.font.Font:
+    "returns the default font at a size, shared by all views (needs pygame.init)"
+    return pygame.font.Font(None, size)
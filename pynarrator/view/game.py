@@ -1,9 +1,10 @@
 from pathlib import Path
 
-import pygame
 from config import Config
 from model import DialogFacade
 from view.base import BaseView
+from view.cache import Frame, FrameCache
+from view.prefetch import Prefetcher
 
 
 class GameView(BaseView):
@@ -17,36 +18,62 @@ class GameView(BaseView):
 
     def __init__(self, config: Config, model: DialogFacade, screen) -> None:
         super().__init__(config, model, screen)
+        self.node = None
+        self.frame_cache = FrameCache(config.frame_cache_size)
+        self.prefetcher = None
+        if config.prefetch:
+            self.prefetcher = Prefetcher(
+                model,
+                self.image_cache,
+                config.image_path,
+                (self.screen_width, self.screen_height),
+            )
         self.update_text()
 
     def update_text(self) -> None:
         "changes screen variables base on current node of the dialog graph"
-        self.background_image_path = str(
-            Path(self.config.image_path) / self.model.current_img
-        )
-        self.background_image = pygame.image.load(self.background_image_path)
-        self.background_image = pygame.transform.scale(
-            self.background_image, (self.config.width, self.config.height)
-        )
+        # a node only changes on a click or a language switch
+        node = self.model.current
+        if node == self.node:
+            return
+        self.node = node
+        # drop text rendered for the previous node / language
+        self.text_cache.clear()
+        self.invalidate()
 
-        self.text = self.model.current_text
-        self.options = [option.text for option in self.model.current_options]
-        self.option_labels = [option.label for option in self.model.current_options]
+        image_path = str(Path(self.config.image_path) / node.image)
+        # only fetch a new background when the dialog node changes its image
+        if image_path != self.background_image_path:
+            self.background_image_path = image_path
+            self.background_image = self.image_cache.get(
+                image_path, (self.config.width, self.config.height)
+            )
 
-    def render(self) -> None:
-        "draws all text the is display in the screen"
-        self.screen.blit(self.background_image, (0, 0))
+        # decode the images of the next nodes before the player clicks
+        if self.prefetcher is not None:
+            self.prefetcher.request(node)
 
-        self.update_text()
-        self.draw_text()
+        self.text = node.text
+        self.options = [option.text for option in node.options]
+        self.option_labels = [option.label for option in node.options]
+
+    def close(self) -> None:
+        if self.prefetcher is not None:
+            self.prefetcher.close()
 
-        # created clickable rectangles in a loop
-        self.option_rects.clear()
-        for i, option in enumerate(self.options):
-            rect = self.draw_choises(option, (int(self.screen_width / 2), 250 + i * 50))
-            self.option_rects.append(rect)
+    def frame(self) -> Frame:
+        "frame of the current node, composed once per node, language and resolution"
+        key = (self.node.label, self.config.language, self.screen.get_size())
+        # a node edited in watch mode keeps its label, so its frame is checked too
+        frame = self.frame_cache.get(key, self.node)
+        if frame is None:
+            frame = self.frame_cache.put(key, self.node, self.compose())
+        return frame
 
-        rect = self.draw_choises(
-            "Back to Main Menu", (int(self.screen_width / 2), self.screen_height - 50)
+    def option_layout(self) -> list[tuple[str, tuple[int, int]]]:
+        "dialog options followed by the button to go back to the menu"
+        layout = super().option_layout()
+        layout.append(
+            ("Back to Main Menu", (int(self.screen_width / 2), self.screen_height - 50))
         )
-        self.option_rects.append(rect)
+        return layout
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextLayout:
+    """
+    breaks text into lines that fit a width, using the font metrics
+    - lines are broken between words, words wider than the line (e.g. long german
+    compounds) are broken with a hyphen
+    - explicit line breaks in the text are kept
+    - results are memoized per (text, font, width), so a text is measured once per
+    node and language instead of every frame
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._layouts: OrderedDict[tuple, tuple[str, ...]] = OrderedDict()
+
+    def wrap(self, font: pygame.font.Font, text: str, width: int) -> tuple[str, ...]:
+        "lines of text that fit in width pixels"
+        key = (text, font, width)
+        lines = self._layouts.get(key)
+        if lines is not None:
+            self.hits += 1
+            self._layouts.move_to_end(key)
+            return lines
+
+        self.misses += 1
+        lines = tuple(
+            line
+            for paragraph in text.split("\n")
+            for line in self.wrap_paragraph(font, paragraph, width)
+        )
+        self._layouts[key] = lines
+        while len(self._layouts) > self.max_entries:
+            self._layouts.popitem(last=False)
+        return lines
+
+    @classmethod
+    def wrap_paragraph(cls, font: pygame.font.Font, text: str, width: int) -> list[str]:
+        "greedy line breaking of a text without line breaks"
+        lines, line = [], ""
+        for word in text.split():
+            candidate = f"{line} {word}" if line else word
+            if font.size(candidate)[0] <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # a word that does not fit in a line of its own
+            pieces = cls.break_word(font, word, width)
+            lines.extend(pieces[:-1])
+            line = pieces[-1]
+        lines.append(line)
+        return lines
+
+    @staticmethod
+    def break_word(font: pygame.font.Font, word: str, width: int) -> list[str]:
+        "splits a word in hyphenated pieces that fit in width, at least a letter each"
+        pieces = []
+        while font.size(word)[0] > width and len(word) > 1:
+            # longest prefix that fits with the hyphen
+            size = len(word) - 1
+            while size > 1 and font.size(word[:size] + "-")[0] > width:
+                size -= 1
+            pieces.append(word[:size] + "-")
+            word = word[size:]
+        pieces.append(word)
+        return pieces
+
+    def clear(self) -> None:
+        self._layouts.clear()
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+
+_text_layout: TextLayout | None = None
+
+
+def get_text_layout() -> TextLayout:
+    "returns the text layout shared by all views, creating it on the first call"
+    global _text_layout
+    if _text_layout is None:
+        _text_layout = TextLayout()
+    return _text_layout
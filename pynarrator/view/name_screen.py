@@ -1,11 +1,7 @@
-import pygame
 from config import Config
 from model import DialogFacade
 from view.base import BaseView
 
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-
 
 class NameScreenView(BaseView):
     "game start screen class, responsible for rendering the screen and handling mouse events"
@@ -17,16 +13,6 @@ class NameScreenView(BaseView):
         self.text = "Enter your name:"
         self.options = []
 
-    def draw_text(self) -> None:
-        "draw central text (e.g title or main dialog)"
-        # TODO: use a function that wrap lines
-        # draw text
-        text_render = self.fontTitle.render(self.text, True, WHITE)
-        rect = text_render.get_rect(
-            center=(self.screen_width / 2, self.screen_height / 2)
-        )
-        # draw text box
-        background_rect = rect.inflate(15, 15)
-        pygame.draw.rect(self.screen, BLACK, background_rect)
-        # render
-        self.screen.blit(text_render, rect)
+    def text_center(self) -> tuple[float, float]:
+        "the name prompt is centered in the screen"
+        return (self.screen_width / 2, self.screen_height / 2)
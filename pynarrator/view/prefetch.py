@@ -0,0 +1,90 @@
+import threading
+from pathlib import Path
+
+import pygame
+from logger import get_logger
+from model import DialogFacade, DialogNode
+from view.cache import ImageCache
+
+logger = get_logger()
+
+
+class Prefetcher:
+    """
+    loads what the player may see after the next click on a worker thread
+    - the target node of each option is looked up, warming lazy dialog stores
+    - their background images are decoded and scaled into the shared image cache,
+    the conversion to the display format is left to the main thread
+    - only the latest request is kept, moving on drops the pending one
+    """
+
+    def __init__(
+        self,
+        model: DialogFacade,
+        image_cache: ImageCache,
+        image_path: str,
+        size: tuple[int, int],
+    ) -> None:
+        self.model = model
+        self.image_cache = image_cache
+        self.image_path = Path(image_path)
+        self.size = size
+        self._pending: DialogNode | None = None
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def request(self, node: DialogNode) -> None:
+        "prefetches the nodes reachable from node, returns right away"
+        with self._condition:
+            self._pending = node
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        "waits until there is no pending request (used by tests and benchmarks)"
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                node, self._pending = self._pending, None
+                self._busy = True
+
+            try:
+                self.prefetch(node)
+            except Exception as exp:
+                # keep the thread alive, prefetching is only an optimization
+                logger.error(f"Error {exp} while prefetching from {node.label}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def prefetch(self, node: DialogNode) -> None:
+        "loads the nodes and images reachable from node"
+        for option in node.options:
+            target = self.model.peek(option.label)
+            if target is None:
+                continue
+            path = str(self.image_path / target.image)
+            try:
+                # SDL display conversions are not thread safe
+                self.image_cache.get(path, self.size, convert=False)
+            except (pygame.error, OSError) as exp:
+                # the render thread reports it if the player gets there
+                logger.debug(f"Error {exp} while prefetching {path}")
@@ -0,0 +1,40 @@
+import time
+
+from config import Config
+from model import DialogFacade, get_save_slots
+from view.base import BaseView
+
+
+class SlotMenuView(BaseView):
+    "load game screen, lists the save slots from the save index"
+
+    DEFAULT_IMAGE = "start_screen.png"
+
+    def __init__(self, config: Config, model: DialogFacade, screen) -> None:
+        super().__init__(config, model, screen)
+        self.slots = get_save_slots(config)
+        self.text = "LOAD GAME"
+        self.options = self.slot_labels()
+
+    def slot_labels(self) -> list[str]:
+        "one line per slot, built from the index only (saves are not opened)"
+        labels = []
+        for slot in range(self.slots.slots):
+            metadata = self.slots.metadata(slot)
+            if metadata is None:
+                labels.append(f"Slot {slot + 1} - Empty")
+                continue
+            saved_at = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(metadata["timestamp"])
+            )
+            labels.append(
+                f"Slot {slot + 1} - {metadata['player'] or '?'} - {metadata['label']}"
+                f" - {metadata['language']} - {saved_at}"
+            )
+        return labels + ["Back to Main Menu"]
+
+    def update_text(self) -> None:
+        options = self.slot_labels()
+        if options != self.options:
+            self.options = options
+            self.invalidate()
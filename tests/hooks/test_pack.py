@@ -0,0 +1,73 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pygame
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from config import Config  # noqa: E402
+from model.compiled import compiled_path, write_compiled  # noqa: E402
+from model.dialog import LoadDialogs  # noqa: E402
+from model.node import DialogNode, DialogOption  # noqa: E402
+from pack import AssetPack, image_entry  # noqa: E402
+from view.cache import ImageCache  # noqa: E402
+
+from hooks.hook_pack import PackAssets  # noqa: E402
+
+
+class TestAssetPack(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        tmp = Path(self.tmp_dir.name)
+        self.dialogs = {
+            "root": DialogNode("root", "Olá!", "a.png", [DialogOption("end", "Tchau")]),
+            "end": DialogNode("end", "Fim", "a.png", []),
+        }
+        for language in ("english", "portuguese"):
+            (tmp / "translated_dialog" / language).mkdir(parents=True)
+            write_compiled(
+                self.dialogs, compiled_path(tmp / "translated_dialog", language)
+            )
+        (tmp / "resized_img").mkdir()
+        pygame.image.save(pygame.Surface((8, 4)), str(tmp / "resized_img" / "a.png"))
+        pygame.image.save(pygame.Surface((8, 4)), str(tmp / "resized_img" / "b.jpg"))
+        (tmp / "resized_img" / "manifest.json").write_text("{}")
+
+        self.pack_path = tmp / "assets.pack"
+        PackAssets(tmp / "translated_dialog", tmp / "resized_img", self.pack_path).run()
+        self.config = Config(
+            dialog_path=str(tmp / "missing"),
+            image_path=str(tmp / "missing"),
+            pack_path=str(self.pack_path),
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_index(self):
+        pack = AssetPack.open(self.pack_path)
+        self.assertEqual(pack.languages, ["english", "portuguese"])
+        self.assertEqual(self.config.get_languages(), ["english", "portuguese"])
+        self.assertEqual(len(pack), 4)
+        # every image written by the resizer, but not its manifest
+        self.assertIn(image_entry("b.jpg"), pack)
+        self.assertNotIn(image_entry("manifest.json"), pack)
+        with self.assertRaises(KeyError):
+            pack.read(image_entry("missing.png"))
+
+    def test_dialogs_from_pack(self):
+        dialogs = LoadDialogs.run(self.config, "english")
+        self.assertEqual(dict(dialogs), self.dialogs)
+
+    def test_images_from_pack(self):
+        pack = AssetPack.open(self.pack_path)
+        cache = ImageCache(1024 * 1024, pack)
+        for name in ("a.png", "b.jpg"):
+            path = str(Path(self.config.image_path) / name)
+            self.assertEqual(cache.get(path, (8, 4)).get_size(), (8, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
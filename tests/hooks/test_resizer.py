@@ -0,0 +1,77 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from hooks.hook_resizer import ResizeImages  # noqa: E402
+
+
+class TestResizeImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmp_dir.name) / "img"
+        self.target = Path(self.tmp_dir.name) / "resized_img"
+        self.source.mkdir()
+        for name, color in (("a.png", "red"), ("b.png", "blue")):
+            Image.new("RGB", (64, 32), color).save(self.source / name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def resize(self, resolutions: str = "hd,fullhd", jobs: int = 1) -> None:
+        ResizeImages(resolutions, self.source, self.target, jobs).run()
+
+    def size(self, path: Path) -> tuple[int, int]:
+        with Image.open(path) as image:
+            return image.size
+
+    def test_several_resolutions(self):
+        self.resize(jobs=2)
+        self.assertEqual(self.size(self.target / "a.png"), (1280, 720))
+        self.assertEqual(self.size(self.target / "fullhd" / "b.png"), (1920, 1080))
+
+    def test_window_resolution(self):
+        self.assertEqual(ResizeImages.to_resolution("window"), (1208, 720))
+        self.assertEqual(ResizeImages.to_resolution("800x600"), (800, 600))
+
+        self.resize("window")
+        with Image.open(self.target / "a.png") as image:
+            self.assertEqual((image.size, image.mode), ((1208, 720), "RGB"))
+
+    def test_keeps_the_source_format(self):
+        Image.new("RGB", (64, 32), "green").save(self.source / "c.jpg")
+        self.resize("window")
+        with Image.open(self.target / "c.jpg") as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (1208, 720)))
+
+    def test_skips_unchanged_images(self):
+        self.resize()
+        mtimes = {p: p.stat().st_mtime_ns for p in self.target.rglob("*.png")}
+
+        Image.new("RGB", (64, 32), "green").save(self.source / "b.png")
+        self.resize()
+        changed = {p for p in mtimes if p.stat().st_mtime_ns != mtimes[p]}
+        self.assertEqual(
+            changed, {self.target / "b.png", self.target / "fullhd" / "b.png"}
+        )
+
+    def test_removes_stale_outputs(self):
+        self.resize()
+        (self.source / "a.png").unlink()
+        self.resize("hd")
+        outputs = {p.relative_to(self.target) for p in self.target.rglob("*.png")}
+        self.assertEqual(outputs, {Path("b.png")})
+
+    def test_invalid_image(self):
+        (self.source / "notes.txt").write_text("not an image")
+        self.resize("hd")
+        self.assertTrue((self.target / "a.png").exists())
+        self.assertFalse((self.target / "notes.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from hooks.scheduler import Scheduler, Stage  # noqa: E402
+
+
+def copy_upper(paths: tuple[str, str]) -> None:
+    source, target = paths
+    Path(target).write_text(Path(source).read_text().upper())
+
+
+def record_jobs(path: str, jobs: int) -> None:
+    Path(path).write_text(str(jobs))
+
+
+def fail(args) -> None:
+    raise RuntimeError("broken stage")
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self.tmp_dir.name)
+        (self.tmp / "a.txt").write_text("a")
+        (self.tmp / "c.txt").write_text("c")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return str(self.tmp / name)
+
+    def stages(self) -> list[Stage]:
+        def copy(name, source, target, deps=()):
+            return Stage(
+                name,
+                copy_upper,
+                (self.path(source), self.path(target)),
+                deps=list(deps),
+                inputs=[self.path(source)],
+                outputs=[self.path(target)],
+            )
+
+        return [
+            copy("first", "a.txt", "b.txt"),
+            copy("second", "b.txt", "d.txt", deps=["first"]),
+            copy("independent", "c.txt", "e.txt"),
+        ]
+
+    def run_stages(self, stages: list[Stage]) -> dict[str, str]:
+        scheduler = Scheduler(stages, cache_file=self.path("cache.json"))
+        return {result.name: result.status for result in scheduler.run()}
+
+    def test_runs_stages_in_order(self):
+        statuses = self.run_stages(self.stages())
+        self.assertEqual(set(statuses.values()), {"done"})
+        self.assertEqual((self.tmp / "d.txt").read_text(), "A")
+        self.assertEqual((self.tmp / "e.txt").read_text(), "C")
+
+    def test_skips_unchanged_stages(self):
+        self.run_stages(self.stages())
+        statuses = self.run_stages(self.stages())
+        self.assertEqual(set(statuses.values()), {"skipped"})
+
+        # only the stages downstream of the edited file run again
+        (self.tmp / "a.txt").write_text("changed")
+        os.utime(self.tmp / "a.txt", ns=(0, 1))
+        statuses = self.run_stages(self.stages())
+        self.assertEqual(
+            statuses, {"first": "done", "second": "done", "independent": "skipped"}
+        )
+        self.assertEqual((self.tmp / "d.txt").read_text(), "CHANGED")
+
+    def test_failed_stage_blocks_dependents(self):
+        stages = self.stages()
+        stages[0].run = fail
+        statuses = self.run_stages(stages)
+        self.assertEqual(
+            statuses, {"first": "failed", "second": "blocked", "independent": "done"}
+        )
+
+    def test_jobs_are_shared_by_parallel_stages(self):
+        def pool(name, deps=()):
+            return Stage(
+                name,
+                record_jobs,
+                self.path(name),
+                deps=list(deps),
+                outputs=[self.path(name)],
+                jobs=4,
+            )
+
+        stages = [pool("left"), pool("right"), pool("after", deps=["left", "right"])]
+        scheduler = Scheduler(stages, cache_file=self.path("cache.json"), jobs=4)
+        scheduler.run()
+
+        jobs = {name: (self.tmp / name).read_text() for name in ("left", "right")}
+        self.assertEqual(jobs, {"left": "2", "right": "2"})
+        # alone, a stage gets the whole budget
+        self.assertEqual((self.tmp / "after").read_text(), "4")
+
+    def test_cycle(self):
+        stages = self.stages()
+        stages[0].deps = ["second"]
+        with self.assertRaises(ValueError):
+            self.run_stages(stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
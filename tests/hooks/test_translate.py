@@ -0,0 +1,159 @@
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from translation_memory import TranslationMemory  # noqa: E402
+
+from hooks.hook_translate import (OUTPUT_FILE, LocalBackend,  # noqa: E402
+                                  TranslateDialogs)
+
+ROOT_TOML = """
+label = "root"
+text = "Ola"
+image = "root.png"
+
+[options.end]
+text = "Tchau"
+"""
+
+END_TOML = """
+label = "end"
+text = "Tchau"
+image = "end.png"
+"""
+
+
+class TestTranslateDialogs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmp_dir.name) / "dialog"
+        self.target = Path(self.tmp_dir.name) / "translated_dialog"
+        self.source.mkdir()
+        (self.source / "root.toml").write_text(ROOT_TOML)
+        (self.source / "end.toml").write_text(END_TOML)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, language: str, label: str) -> dict:
+        with open(self.target / language / OUTPUT_FILE, "r") as fp:
+            dialogs = {dialog["label"]: dialog for dialog in json.load(fp)}
+        return dialogs[label]
+
+    def test_translate_all_languages(self):
+        backend = LocalBackend()
+        languages = ["english", "spanish", "portuguese"]
+        TranslateDialogs(languages, self.source, self.target, backend, rate=0).run()
+
+        root = self.read("english", "root")
+        self.assertEqual(root["text"], "[english] Ola")
+        self.assertEqual(root["options"]["end"]["text"], "[english] Tchau")
+        self.assertEqual(root["image"], "root.png")
+        self.assertEqual(self.read("spanish", "end")["text"], "[spanish] Tchau")
+        # the source language is copied as is
+        self.assertEqual(self.read("portuguese", "end")["text"], "Tchau")
+
+    def test_source_language(self):
+        backend = LocalBackend()
+        TranslateDialogs(
+            ["english", "portuguese"],
+            self.source,
+            self.target,
+            backend,
+            rate=0,
+            source_language="english",
+        ).run()
+
+        self.assertEqual(self.read("english", "end")["text"], "Tchau")
+        self.assertEqual(self.read("portuguese", "end")["text"], "[portuguese] Tchau")
+
+    def test_unique_strings_are_batched(self):
+        backend = LocalBackend()
+        translator = TranslateDialogs(
+            ["english", "spanish"], self.source, self.target, backend, rate=0
+        )
+        translator.run()
+        # "Tchau" is used twice but both strings fit a single batch per language
+        self.assertEqual(backend.calls, 2)
+
+    def test_streams_small_batches(self):
+        backend = LocalBackend()
+        TranslateDialogs(
+            ["english", "spanish"],
+            self.source,
+            self.target,
+            backend,
+            batch_size=1,
+            workers=1,
+            rate=0,
+        ).run()
+        # one batch per new string and language, written to one file per language
+        self.assertEqual(backend.calls, 4)
+        self.assertEqual(self.read("spanish", "root")["text"], "[spanish] Ola")
+        self.assertEqual(
+            sorted(p.name for p in (self.target / "english").iterdir()), [OUTPUT_FILE]
+        )
+
+    def test_retries_failed_batches(self):
+        backend = LocalBackend()
+        failures = iter([ConnectionError("timeout")])
+        translate_batch = backend.translate_batch
+
+        def flaky(texts, source, target):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            return translate_batch(texts, source, target)
+
+        backend.translate_batch = flaky
+        translator = TranslateDialogs(
+            ["english"], self.source, self.target, backend, rate=0
+        )
+        translator.run()
+        self.assertEqual(self.read("english", "end")["text"], "[english] Tchau")
+
+    def test_rebuild_reuses_memory(self):
+        memory = TranslationMemory(Path(self.tmp_dir.name) / "memory.db")
+        backend = LocalBackend()
+        TranslateDialogs(
+            ["english"], self.source, self.target, backend, rate=0, memory=memory
+        ).run()
+        self.assertEqual((memory.hits, memory.misses), (0, 2))
+
+        # only the edited string is translated again
+        (self.source / "end.toml").write_text(END_TOML.replace("Tchau", "Adeus"))
+        with redirect_stdout(io.StringIO()) as output:
+            TranslateDialogs(
+                ["english"], self.source, self.target, backend, rate=0, memory=memory
+            ).run()
+        self.assertEqual((memory.hits, memory.misses), (2, 3))
+        self.assertIn("2 hits, 3 misses", output.getvalue())
+        self.assertEqual(self.read("english", "end")["text"], "[english] Adeus")
+        self.assertEqual(self.read("english", "root")["text"], "[english] Ola")
+        memory.close()
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def test_lookup_and_store(self):
+        memory = TranslationMemory()
+        args = "portuguese", "english", "local"
+        self.assertEqual(memory.lookup(["Ola", "Ola"], *args), {})
+        self.assertEqual((memory.hits, memory.misses), (0, 1))
+
+        memory.store({"Ola": "Hello"}, *args)
+        self.assertEqual(memory.lookup(["Ola", "Tchau"], *args), {"Ola": "Hello"})
+        self.assertEqual((memory.hits, memory.misses), (1, 2))
+        # entries are specific to the language pair and backend
+        self.assertEqual(memory.lookup(["Ola"], "portuguese", "spanish", "local"), {})
+        self.assertEqual(memory.lookup(["Ola"], "portuguese", "english", "google"), {})
+        memory.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from model.autosave import Autosave, write_atomic
+
+
+class TestAutosave(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "save.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self) -> dict:
+        with open(self.path, "r") as fp:
+            return json.load(fp)
+
+    def test_write_atomic(self):
+        write_atomic(self.path, {"current": "root"})
+        write_atomic(self.path, {"current": "end"})
+
+        self.assertEqual(self.read(), {"current": "end"})
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+
+    def test_close_flushes_latest_save(self):
+        autosave = Autosave(interval=60)
+        autosave.save(self.path, {"current": "root"})
+        autosave.save(self.path, {"current": "end"})
+        autosave.close()
+
+        self.assertEqual(self.read(), {"current": "end"})
+
+    def test_load_prefers_memory(self):
+        write_atomic(self.path, {"current": "root"})
+        autosave = Autosave(interval=60)
+        self.assertEqual(autosave.load(self.path), {"current": "root"})
+
+        autosave.save(self.path, {"current": "end"})
+        self.assertEqual(autosave.load(self.path), {"current": "end"})
+        autosave.close()
+
+    def test_load_without_save(self):
+        autosave = Autosave(interval=60)
+        self.assertIsNone(autosave.load(self.path))
+        autosave.close()
+        self.assertFalse(self.path.exists())
+
+    def test_save_several_files(self):
+        other = self.path.with_name("index.json")
+        autosave = Autosave(interval=60)
+        autosave.save(self.path, {"current": "root"})
+        autosave.save(other, {"0": {"label": "root"}})
+        autosave.close()
+
+        self.assertEqual(self.read(), {"current": "root"})
+        with open(other, "r") as fp:
+            self.assertEqual(json.load(fp), {"0": {"label": "root"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
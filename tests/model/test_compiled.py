@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from model.compiled import CompiledDialogs, compile_dialogs, write_compiled
+from model.dialog import DialogNode, DialogOption
+
+
+class TestCompiledDialogs(unittest.TestCase):
+    def setUp(self):
+        self.dialogs = {
+            "root": DialogNode(
+                "root",
+                "Olá!",
+                "waiter.png",
+                [DialogOption("end", "Tchau"), DialogOption("root", "Olá!")],
+            ),
+            "end": DialogNode(
+                "end", "Fim", "waiter.png", [DialogOption("root", "De novo")]
+            ),
+            "empty": DialogNode("empty", "", "", []),
+        }
+
+    def test_round_trip(self):
+        compiled = CompiledDialogs(compile_dialogs(self.dialogs))
+
+        self.assertEqual(len(compiled), len(self.dialogs))
+        self.assertEqual(set(compiled), set(self.dialogs))
+        for label, node in self.dialogs.items():
+            self.assertEqual(compiled[label], node)
+
+    def test_nodes_are_decoded_once(self):
+        compiled = CompiledDialogs(compile_dialogs(self.dialogs))
+        self.assertIs(compiled["root"], compiled["root"])
+
+    def test_missing_label(self):
+        compiled = CompiledDialogs(compile_dialogs(self.dialogs))
+        self.assertNotIn("missing", compiled)
+        with self.assertRaises(KeyError):
+            compiled["missing"]
+
+    def test_open_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "dialogs.bin"
+            write_compiled(self.dialogs, path)
+            compiled = CompiledDialogs.open(path)
+            self.assertEqual(compiled["end"], self.dialogs["end"])
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            CompiledDialogs(b"NOPE" + bytes(16))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,36 @@
+import json
+import os
+import tempfile
+import tomllib
 import unittest
+from dataclasses import FrozenInstanceError
+from pathlib import Path
+from unittest import mock
 
-from model.dialog import DialogNode, DialogOption, LoadDialogs
+from config import Config
+from model.compiled import compiled_path, write_compiled
+from model.dialog import (DialogFacade, DialogNode, DialogOption,
+                          DialogWatcher, LazyDialogs, LoadDialogs)
+
+ROOT_TOML = """
+label = "root"
+text = "Start"
+image = "root.png"
+
+[A]
+label = "end"
+text = "Go to the end"
+"""
+
+END_TOML = """
+label = "end"
+text = "The End"
+image = "end.png"
+
+[A]
+label = "root"
+text = "Again"
+"""
 
 
 class TestDialogModel(unittest.TestCase):
@@ -74,6 +104,17 @@ class TestDialogModel(unittest.TestCase):
         with self.assertRaises(KeyError):
             LoadDialogs.parse_option(test_option_data_incomplete)
 
+    def test_dialog_node_is_immutable(self):
+        node = DialogNode(
+            "start", "Start Dialog", "start.png", [DialogOption("end", "End")]
+        )
+
+        self.assertIsInstance(node.options, tuple)
+        with self.assertRaises(FrozenInstanceError):
+            node.text = "Changed"
+        with self.assertRaises(FrozenInstanceError):
+            node.options[0].label = "other"
+
     def test_validate_dialogs_valid_dialog(self):
         dialog_map = {
             "start": DialogNode(
@@ -106,5 +147,283 @@ class TestDialogModel(unittest.TestCase):
             LoadDialogs.validate_dialogs(dialog_map)
 
 
+class TestLoadDialogFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        for i in range(100):
+            folder = self.path / str(i % 3)
+            folder.mkdir(exist_ok=True)
+            (folder / f"node_{i}.toml").write_text(
+                ROOT_TOML.replace('"root"', f'"node_{i}"')
+            )
+        (self.path / "broken.toml").write_text("label = ")
+        (self.path / "broken.json").write_text("{")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_scan_files(self):
+        files = list(LoadDialogs.scan_files(self.path))
+        self.assertEqual(len(files), 102)
+
+    def test_errors_are_reported_once(self):
+        for jobs in (1, 2):
+            with self.assertLogs("pynarrator", level="ERROR") as logs:
+                dialogs = list(LoadDialogs.load_tomls(self.path, jobs))
+
+            self.assertEqual(len(dialogs), 100)
+            self.assertEqual(len(logs.records), 1)
+            self.assertIn("2 dialog files", logs.output[0])
+
+
+class TestBulkDialogFiles(unittest.TestCase):
+    "json files holding every dialog of a language, as written by the translate hook"
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        dialogs = [tomllib.loads(ROOT_TOML), tomllib.loads(END_TOML)]
+        (self.path / "dialogs.json").write_text(json.dumps(dialogs))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_graph(self):
+        dialogs = LoadDialogs.load_graph(self.path)
+        self.assertEqual(set(dialogs), {"root", "end"})
+        self.assertEqual(dialogs["end"].options[0].label, "root")
+
+    def test_lazy_dialogs(self):
+        index = LazyDialogs.build_index(self.path)
+        self.assertEqual({entry[0] for entry in index.values()}, {"dialogs.json"})
+
+        dialogs = LazyDialogs.open(self.path)
+        self.assertEqual(dialogs["root"].text, "Start")
+        self.assertEqual(dialogs["end"].text, "The End")
+
+    def test_lazy_miss_parses_a_single_node(self):
+        # cache smaller than the graph, every visit is a miss
+        dialogs = LazyDialogs.open(self.path, max_nodes=1)
+        with mock.patch.object(
+            LoadDialogs, "parse_dialog", wraps=LoadDialogs.parse_dialog
+        ) as parse_dialog:
+            for label in ("root", "end", "root", "end"):
+                self.assertEqual(dialogs[label].label, label)
+        self.assertEqual(parse_dialog.call_count, 4)
+
+
+class TestLazyDialogs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        (self.path / "A").mkdir()
+        (self.path / "root.toml").write_text(ROOT_TOML)
+        (self.path / "A" / "the_end.toml").write_text(END_TOML)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build_index(self):
+        index = LazyDialogs.build_index(self.path)
+        self.assertEqual(
+            index, {"root": "root.toml", "end": str(Path("A/the_end.toml"))}
+        )
+
+    def test_nodes_are_parsed_on_first_visit(self):
+        dialogs = LazyDialogs.open(self.path, max_nodes=1)
+        self.assertEqual(len(dialogs), 2)
+        self.assertIn("end", dialogs)
+
+        root = dialogs["root"]
+        self.assertEqual(root.text, "Start")
+        self.assertIs(dialogs["root"], root)
+
+        # cache holds a single node, so root is evicted by end
+        self.assertEqual(dialogs["end"].options[0].label, "root")
+        self.assertIsNot(dialogs["root"], root)
+        self.assertEqual(dialogs["root"], root)
+
+    def test_index_file_is_used(self):
+        LazyDialogs.write_index(self.path)
+        (self.path / "root.toml").unlink()
+        (self.path / "moved.toml").write_text(ROOT_TOML)
+
+        # stale index still points to the old file
+        with self.assertRaises(KeyError):
+            LazyDialogs.open(self.path)["root"]
+
+    def test_offline_validation(self):
+        dialogs = LazyDialogs.open(self.path)
+        self.assertIsNone(LoadDialogs.validate_dialogs(dialogs))
+
+
+class TestDialogWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+        (self.path / "root.toml").write_text(ROOT_TOML)
+        (self.path / "end.toml").write_text(END_TOML)
+        self.watcher = DialogWatcher(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def touch(self, name: str, content: str) -> None:
+        file = self.path / name
+        mtime = file.stat().st_mtime_ns if file.exists() else 0
+        file.write_text(content)
+        # make sure the mtime changes even on coarse grained file systems
+        os.utime(file, ns=(mtime + 10**9, mtime + 10**9))
+
+    def test_initial_load(self):
+        self.assertEqual(set(self.watcher), {"root", "end"})
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_touched_but_unchanged(self):
+        self.touch("end.toml", END_TOML)
+        self.assertEqual(self.watcher.poll(), set())
+
+    def test_changed_file_is_patched(self):
+        root = self.watcher["root"]
+        self.touch("end.toml", END_TOML.replace("The End", "Edited"))
+
+        self.assertEqual(self.watcher.poll(), {"end"})
+        self.assertEqual(self.watcher["end"].text, "Edited")
+        self.assertIs(self.watcher["root"], root)
+
+    def test_removed_file(self):
+        (self.path / "end.toml").unlink()
+
+        with self.assertLogs("pynarrator", level="ERROR"):
+            self.assertEqual(self.watcher.poll(), {"end"})
+        self.assertNotIn("end", self.watcher)
+
+    def test_facade_keeps_position(self):
+        config = Config(source_dialog_path=str(self.path), watch_dialogs=True)
+        model = DialogFacade(config)
+        model.next("end")
+        self.touch("end.toml", END_TOML.replace("The End", "Edited"))
+
+        self.assertTrue(model.poll_changes())
+        self.assertEqual(model.current_text, "Edited")
+        self.assertEqual(tuple(model.history), ("root", "end"))
+        model.next("root")
+
+    def test_watch_mode_ignores_the_build(self):
+        # a language already compiled by cli.py
+        with tempfile.TemporaryDirectory() as build_dir:
+            (Path(build_dir) / "portuguese").mkdir()
+            write_compiled(
+                LoadDialogs.load_graph(self.path),
+                compiled_path(build_dir, "portuguese"),
+            )
+            config = Config(
+                source_dialog_path=str(self.path),
+                dialog_path=build_dir,
+                watch_dialogs=True,
+            )
+
+            self.assertIsInstance(LoadDialogs.run(config), DialogWatcher)
+
+    def test_watch_mode_only_follows_the_source_language(self):
+        with tempfile.TemporaryDirectory() as build_dir:
+            (Path(build_dir) / "english").mkdir()
+            (Path(build_dir) / "english" / "root.toml").write_text(ROOT_TOML)
+            (Path(build_dir) / "english" / "end.toml").write_text(END_TOML)
+            config = Config(
+                source_dialog_path=str(self.path),
+                dialog_path=build_dir,
+                watch_dialogs=True,
+            )
+
+            with self.assertLogs("pynarrator", level="ERROR"):
+                dialogs = LoadDialogs.run(config, "english")
+            self.assertNotIsInstance(dialogs, DialogWatcher)
+
+
+class TestDialogFacade(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = Path(self.tmp_dir.name)
+        for language, prefix in (("portuguese", ""), ("english", "EN ")):
+            (path / language).mkdir()
+            (path / language / "root.toml").write_text(
+                ROOT_TOML.replace('text = "', f'text = "{prefix}')
+            )
+            (path / language / "end.toml").write_text(
+                END_TOML.replace('text = "', f'text = "{prefix}')
+            )
+        self.config = Config(dialog_path=str(path))
+        self.config.language = "portuguese"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_walk(self):
+        model = DialogFacade(self.config)
+        self.assertEqual(model.current.label, "root")
+
+        model.next("end")
+        self.assertEqual(model.current_text, "The End")
+        self.assertEqual(tuple(model.history), ("root", "end"))
+
+    def test_language_switch_keeps_position(self):
+        model = DialogFacade(self.config)
+        model.next("end")
+
+        self.config.language = "english"
+        model.reload_config(self.config)
+
+        self.assertEqual(model.current.label, "end")
+        self.assertEqual(model.current_text, "EN The End")
+        self.assertEqual(tuple(model.history), ("root", "end"))
+
+        model.next("root")
+        self.assertEqual(model.current_text, "EN Start")
+
+    def test_save_and_load(self):
+        model = DialogFacade(self.config)
+        model.next("end")
+        model.next("root")
+        save = model.dump()
+
+        model.reset()
+        model.load(save, verify=True)
+        self.assertEqual(model.current.label, "root")
+        self.assertEqual(tuple(model.history), ("root", "end", "root"))
+        model.next("end")
+
+    def test_load_invalid_path(self):
+        model = DialogFacade(self.config)
+        model.next("end")
+        save = model.dump()
+        save["current"] = "root"  # root -> root is not an option
+
+        with self.assertLogs("pynarrator", level="ERROR"):
+            model.load(save, verify=True)
+        self.assertEqual(tuple(model.history), ("root",))
+
+    def test_back(self):
+        model = DialogFacade(self.config)
+        model.next("end")
+        model.next("root")
+
+        self.assertEqual(model.back().label, "end")
+        self.assertEqual(tuple(model.history), ("root", "end"))
+        self.assertEqual(model.back().label, "root")
+        self.assertEqual(model.back().label, "root")
+        model.next("end")
+
+    def test_load_legacy_save(self):
+        model = DialogFacade(self.config)
+        model.load(["root", "end", "root", "end"])
+
+        self.assertEqual(model.current.label, "end")
+        self.assertEqual(tuple(model.history), ("root", "end", "root", "end"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from model.history import History
+
+
+class TestHistory(unittest.TestCase):
+    def test_self_loop_is_a_single_run(self):
+        history = History(["root"] + ["esperar"] * 10)
+
+        self.assertEqual(history.entries, [(("root",), 1), (("esperar",), 10)])
+        self.assertEqual(len(history), 11)
+
+    def test_cycle_is_folded(self):
+        path = ["root"] + ["continuar_pedido", "esperar"] * 20 + ["end"]
+        history = History(path)
+
+        self.assertEqual(list(history), path)
+        self.assertEqual(
+            history.entries,
+            [
+                (("root",), 1),
+                (("continuar_pedido", "esperar"), 20),
+                (("end",), 1),
+            ],
+        )
+
+    def test_pop(self):
+        path = ["root"] + ["a", "b"] * 3
+        history = History(path)
+
+        self.assertEqual(history.pop(), "b")
+        self.assertEqual(history.last, "a")
+        self.assertEqual(list(history), path[:-1])
+
+        history.append("b")
+        self.assertEqual(list(history), path)
+
+    def test_tail(self):
+        history = History(["root", "a", "b", "a", "b", "c"])
+        self.assertEqual(history.tail(3), ["a", "b", "c"])
+        self.assertEqual(history.tail(10), list(history))
+
+    def test_maxlen(self):
+        history = History(maxlen=3)
+        for label in ["root", "a", "b", "a", "b", "c"]:
+            history.append(label)
+
+        self.assertEqual(list(history), ["a", "b", "c"])
+        self.assertEqual(len(history), 3)
+
+    def test_from_entries(self):
+        history = History(["root"] + ["a", "b"] * 5)
+        copy = History.from_entries(history.entries)
+
+        self.assertEqual(list(copy), list(history))
+        self.assertEqual(copy.entries, history.entries)
+
+
+if __name__ == "__main__":
+    unittest.main()
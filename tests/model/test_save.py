@@ -0,0 +1,52 @@
+import unittest
+
+from model.history import History
+from model.save import (decode_save, decode_varints, encode_save,
+                        encode_varints, graph_checksum)
+
+
+class TestSaveFormat(unittest.TestCase):
+    def setUp(self):
+        self.labels = sorted(["root", "menu", "drink", "end"])
+
+    def test_varint_round_trip(self):
+        values = [0, 1, 127, 128, 300, 2**32 + 5]
+        data = encode_varints(values)
+
+        self.assertEqual(decode_varints(data), values)
+        self.assertEqual(len(encode_varints([1, 2, 3])), 3)
+
+    def test_truncated_varint(self):
+        with self.assertRaises(ValueError):
+            decode_varints(encode_varints([300])[:1])
+
+    def test_save_round_trip(self):
+        path = ["root"] + ["menu", "drink"] * 50 + ["end"]
+        save = encode_save(self.labels, "end", History(path))
+        current, history = decode_save(self.labels, save)
+
+        self.assertEqual(current, "end")
+        self.assertEqual(list(history), path)
+        # the cycle is stored as a single run
+        self.assertEqual(len(history.entries), 3)
+
+    def test_save_with_history_limit(self):
+        path = ["root", "menu", "drink", "end"]
+        save = encode_save(self.labels, "end", History(path))
+        _, history = decode_save(self.labels, save, maxlen=2)
+
+        self.assertEqual(list(history), ["drink", "end"])
+
+    def test_checksum_depends_on_labels(self):
+        self.assertNotEqual(
+            graph_checksum(self.labels), graph_checksum(self.labels + ["new"])
+        )
+
+    def test_different_graph(self):
+        save = encode_save(self.labels, "end", History(["root", "end"]))
+        with self.assertRaises(ValueError):
+            decode_save(sorted(self.labels + ["new"]), save)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from model.autosave import Autosave
+from model.slots import SaveSlots
+
+
+class TestSaveSlots(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def new_slots(self) -> SaveSlots:
+        return SaveSlots(self.path, 3, Autosave(interval=60))
+
+    def test_save_writes_slot_and_index(self):
+        slots = self.new_slots()
+        slots.save(1, {"current": "end"}, "end", "Ana", "english")
+        slots.close()
+
+        with open(self.path / "slot_1.json", "r") as fp:
+            self.assertEqual(json.load(fp), {"current": "end"})
+        with open(self.path / "index.json", "r") as fp:
+            index = json.load(fp)
+        self.assertEqual(list(index), ["1"])
+        self.assertEqual(index["1"]["label"], "end")
+        self.assertEqual(index["1"]["player"], "Ana")
+        self.assertEqual(index["1"]["language"], "english")
+
+    def test_listing_reads_only_the_index(self):
+        slots = self.new_slots()
+        slots.save(0, {"current": "root"}, "root", "Ana", "english")
+        slots.save(2, {"current": "end"}, "end", "Bob", "portuguese")
+        slots.close()
+        # slot files are only opened when loaded
+        (self.path / "slot_0.json").unlink()
+
+        slots = self.new_slots()
+        self.assertEqual(slots.metadata(0)["player"], "Ana")
+        self.assertIsNone(slots.metadata(1))
+        self.assertEqual(slots.metadata(2)["label"], "end")
+        self.assertEqual(slots.load(2), {"current": "end"})
+        self.assertIsNone(slots.load(1))
+        slots.close()
+
+    def test_legacy_save_is_moved_to_a_slot(self):
+        # saves of older versions, the list of visited labels
+        (self.path / "save.json").write_text(json.dumps(["root", "end"]))
+
+        slots = self.new_slots()
+        self.assertEqual(slots.migrate_legacy("english"), 0)
+        self.assertEqual(slots.metadata(0)["label"], "end")
+        self.assertEqual(slots.metadata(0)["language"], "english")
+        self.assertEqual(slots.load(0), ["root", "end"])
+        slots.close()
+
+        self.assertFalse((self.path / "save.json").exists())
+        self.assertTrue((self.path / "save.json.bak").exists())
+        # moved only once
+        slots = self.new_slots()
+        self.assertIsNone(slots.migrate_legacy("english"))
+        self.assertEqual(slots.load(0), ["root", "end"])
+        slots.close()
+
+    def test_free_slot(self):
+        slots = self.new_slots()
+        self.assertEqual(slots.free_slot(), 0)
+        for slot in (0, 1, 2):
+            slots.save(slot, {}, "root", "", "english")
+        self.assertEqual(slots.free_slot(), 0)
+
+        slots.save(0, {}, "end", "", "english")
+        self.assertEqual(slots.free_slot(), 1)
+        slots.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import unittest
+from unittest import mock
+
+import main
+import pygame
+from config import Config
+from controller import GameStateGame, GameStateMenu
+
+# headless display for the main loop
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+class TestControllers(unittest.TestCase):
+    def setUp(self):
+        self.views = {GameStateMenu: mock.Mock(), GameStateGame: mock.Mock()}
+        self.controllers = {GameStateMenu: mock.Mock(), GameStateGame: mock.Mock()}
+        state_map = tuple(
+            (state, self.views[state], self.controllers[state])
+            for state in (GameStateMenu, GameStateGame)
+        )
+        patcher = mock.patch.object(main, "CLASS_STATE_MAP", state_map)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_states_are_built_on_first_access(self):
+        config, model, screen = Config(), mock.Mock(), mock.Mock()
+        controllers = main.Controllers(config, model, screen)
+        self.views[GameStateMenu].assert_not_called()
+        self.controllers[GameStateMenu].assert_not_called()
+
+        menu = controllers[GameStateMenu]
+        self.views[GameStateMenu].assert_called_once_with(config, model, screen)
+        self.controllers[GameStateMenu].assert_called_once_with(
+            config, model, self.views[GameStateMenu].return_value
+        )
+        self.assertIs(menu, self.controllers[GameStateMenu].return_value)
+
+        # built once, other states are left alone
+        self.assertIs(controllers[GameStateMenu], menu)
+        self.views[GameStateMenu].assert_called_once()
+        self.views[GameStateGame].assert_not_called()
+        self.assertEqual(list(controllers.values()), [menu])
+
+    def test_unknown_state(self):
+        controllers = main.Controllers(Config(), mock.Mock(), mock.Mock())
+        with self.assertRaises(KeyError):
+            controllers[object()]
+
+
+class TestMainLoop(unittest.TestCase):
+    def setUp(self):
+        self.view = mock.Mock()
+        self.view.render.return_value = [pygame.Rect(0, 0, 10, 10)]
+        self.controller = mock.Mock(view=self.view)
+        state_map = (
+            (GameStateMenu, mock.Mock(), mock.Mock(return_value=self.controller)),
+        )
+        self.slots = mock.Mock()
+        for patcher in (
+            mock.patch.object(main, "CLASS_STATE_MAP", state_map),
+            mock.patch.object(main, "DialogFacade"),
+            mock.patch.object(main, "get_save_slots", return_value=self.slots),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(pygame.quit)
+
+    def post(self, *events: pygame.event.Event) -> None:
+        # the display must exist before events are queued
+        pygame.display.init()
+        pygame.event.clear()
+        for event in events:
+            pygame.event.post(event)
+
+    def test_one_render_per_frame(self):
+        self.post(
+            *(pygame.event.Event(pygame.MOUSEMOTION, pos=(i, i)) for i in range(5))
+        )
+        main.main(max_frames=1)
+
+        motions = [
+            call
+            for call in self.controller.handle_events.call_args_list
+            if call.args[0].type == pygame.MOUSEMOTION
+        ]
+        self.assertEqual(len(motions), 5)
+        self.view.invalidate.assert_called_once()
+        self.view.render.assert_called_once()
+
+    def test_quit_closes_views_and_saves(self):
+        # the menu is built by the first event, the loop stops before rendering
+        self.post(
+            pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0)),
+            pygame.event.Event(pygame.QUIT),
+        )
+        main.main()
+
+        self.view.render.assert_not_called()
+        self.view.close.assert_called_once()
+        self.slots.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
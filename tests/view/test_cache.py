@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pygame
+from view.cache import Frame, FrameCache, ImageCache, TextCache
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name in ("a.png", "b.png", "c.png"):
+            path = Path(self.tmp_dir.name) / name
+            pygame.image.save(pygame.Surface((8, 8)), str(path))
+            self.paths.append(str(path))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hits_and_misses(self):
+        cache = ImageCache(max_bytes=1024 * 1024)
+        first = cache.get(self.paths[0], (4, 4))
+        second = cache.get(self.paths[0], (4, 4))
+
+        self.assertIs(first, second)
+        self.assertEqual(first.get_size(), (4, 4))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_size_is_part_of_the_key(self):
+        cache = ImageCache(max_bytes=1024 * 1024)
+        cache.get(self.paths[0], (4, 4))
+        cache.get(self.paths[0], (2, 2))
+
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_no_scaling_at_the_right_size(self):
+        with mock.patch("pygame.transform.scale") as scale:
+            surface = ImageCache.load_surface(self.paths[0], (8, 8))
+        scale.assert_not_called()
+        self.assertEqual(surface.get_size(), (8, 8))
+
+    def test_lru_eviction(self):
+        cache = ImageCache(max_bytes=0)
+        cache.get(self.paths[0], (4, 4))
+        cache.max_bytes = 2 * cache.size_bytes
+
+        cache.get(self.paths[1], (4, 4))
+        cache.get(self.paths[0], (4, 4))  # refresh "a"
+        cache.get(self.paths[2], (4, 4))  # evicts "b"
+
+        self.assertIn((self.paths[0], (4, 4)), cache)
+        self.assertNotIn((self.paths[1], (4, 4)), cache)
+        self.assertIn((self.paths[2], (4, 4)), cache)
+        self.assertLessEqual(cache.size_bytes, cache.max_bytes)
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 20)
+
+    def test_render_is_cached(self):
+        cache = TextCache()
+        first = cache.render(self.font, "hello", (255, 255, 255))
+        second = cache.render(self.font, "hello", (255, 255, 255))
+
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_color_is_part_of_the_key(self):
+        cache = TextCache()
+        first = cache.render(self.font, "hello", (255, 255, 255))
+        second = cache.render(self.font, "hello", (0, 0, 0))
+
+        self.assertIsNot(first, second)
+
+    def test_render_box_adds_padding(self):
+        cache = TextCache()
+        text = cache.render(self.font, "hello", (255, 255, 255))
+        box = cache.render_box(self.font, "hello", (255, 255, 255), (0, 0, 0), 10)
+
+        self.assertEqual(box.get_width(), text.get_width() + 10)
+        self.assertEqual(box.get_height(), text.get_height() + 10)
+        self.assertIs(
+            box, cache.render_box(self.font, "hello", (255, 255, 255), (0, 0, 0), 10)
+        )
+
+    def test_max_entries(self):
+        cache = TextCache(max_entries=2)
+        for text in ("a", "b", "c"):
+            cache.render(self.font, text, (255, 255, 255))
+
+        self.assertEqual(len(cache), 2)
+
+
+class TestFrameCache(unittest.TestCase):
+    def frame(self) -> Frame:
+        rect = pygame.Rect(0, 0, 4, 4)
+        return Frame(pygame.Surface((8, 8)), rect, (rect,), (rect.inflate(-2, -2),))
+
+    def test_frames_are_reused(self):
+        cache = FrameCache(max_frames=2)
+        key = ("root", "english", (8, 8))
+        self.assertIsNone(cache.get(key, "node"))
+
+        frame = cache.put(key, "node", self.frame())
+        self.assertIs(cache.get(key, "node"), frame)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # same label, but the node changed (e.g. edited in watch mode)
+        self.assertIsNone(cache.get(key, "edited node"))
+
+    def test_lru_eviction(self):
+        cache = FrameCache(max_frames=2)
+        for label in ("a", "b"):
+            cache.put((label,), label, self.frame())
+        cache.get(("a",), "a")
+        cache.put(("c",), "c", self.frame())
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("b",), "b"))
+        self.assertIsNotNone(cache.get(("a",), "a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import pygame
+from view.cache import TextCache
+from view.layout import TextLayout
+
+LONG_TEXT = (
+    "Der Kellner bringt Ihnen die Speisekarte und wartet geduldig, "
+    "bis Sie sich für ein Gericht entschieden haben."
+)
+
+
+class TestTextLayout(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+        self.font = pygame.font.Font(None, 26)
+
+    def test_lines_fit_the_width(self):
+        layout = TextLayout()
+        lines = layout.wrap(self.font, LONG_TEXT, 200)
+
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(self.font.size(line)[0] <= 200 for line in lines))
+        self.assertEqual(" ".join(lines), LONG_TEXT)
+
+    def test_short_text_is_a_single_line(self):
+        layout = TextLayout()
+        self.assertEqual(layout.wrap(self.font, "Start", 200), ("Start",))
+
+    def test_wrap_is_memoized(self):
+        layout = TextLayout()
+        first = layout.wrap(self.font, LONG_TEXT, 200)
+        second = layout.wrap(self.font, LONG_TEXT, 200)
+        layout.wrap(self.font, LONG_TEXT, 300)
+
+        self.assertIs(first, second)
+        self.assertEqual((layout.hits, layout.misses), (1, 2))
+
+    def test_long_word_is_hyphenated(self):
+        layout = TextLayout()
+        word = "Donaudampfschifffahrtsgesellschaftskapitän"
+        lines = layout.wrap(self.font, word, 100)
+
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(line.endswith("-") for line in lines[:-1]))
+        self.assertTrue(all(self.font.size(line)[0] <= 100 for line in lines))
+        self.assertEqual("".join(line.rstrip("-") for line in lines), word)
+
+    def test_line_breaks_are_kept(self):
+        layout = TextLayout()
+        self.assertEqual(
+            layout.wrap(self.font, "first\nsecond", 500), ("first", "second")
+        )
+
+    def test_max_entries(self):
+        layout = TextLayout(max_entries=2)
+        for text in ("a", "b", "c"):
+            layout.wrap(self.font, text, 100)
+
+        self.assertEqual(len(layout), 2)
+
+    def test_lines_box_stacks_lines(self):
+        cache = TextCache()
+        lines = TextLayout().wrap(self.font, LONG_TEXT, 200)
+        box = cache.render_lines_box(self.font, lines, (255, 255, 255), (0, 0, 0), 10)
+
+        widths, heights = zip(*(self.font.size(line) for line in lines))
+        self.assertEqual(box.get_width(), max(widths) + 10)
+        self.assertEqual(box.get_height(), sum(heights) + 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pygame
+from config import Config
+from model import DialogFacade
+from view.cache import ImageCache
+from view.prefetch import Prefetcher
+
+ROOT_TOML = """
+label = "root"
+text = "Start"
+image = "root.png"
+
+[A]
+label = "end"
+text = "Go to the end"
+
+[B]
+label = "root"
+text = "Stay"
+"""
+
+END_TOML = """
+label = "end"
+text = "The End"
+image = "end.png"
+"""
+
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = Path(self.tmp_dir.name)
+        (path / "portuguese").mkdir()
+        (path / "portuguese" / "root.toml").write_text(ROOT_TOML)
+        (path / "portuguese" / "end.toml").write_text(END_TOML)
+        for name in ("root.png", "end.png"):
+            pygame.image.save(pygame.Surface((8, 8)), str(path / name))
+
+        self.config = Config(
+            dialog_path=str(path), image_path=str(path), lazy_dialogs=True
+        )
+        self.config.language = "portuguese"
+        self.cache = ImageCache(max_bytes=1024 * 1024)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_images_of_next_nodes_are_loaded(self):
+        model = DialogFacade(self.config)
+        prefetcher = Prefetcher(model, self.cache, self.config.image_path, (4, 4))
+        prefetcher.request(model.current)
+        self.assertTrue(prefetcher.wait_idle(timeout=5))
+        prefetcher.close()
+
+        end_image = str(Path(self.config.image_path) / "end.png")
+        root_image = str(Path(self.config.image_path) / "root.png")
+        self.assertIn((end_image, (4, 4)), self.cache)
+        self.assertIn((root_image, (4, 4)), self.cache)
+        # the render thread finds it in the cache
+        self.cache.get(end_image, (4, 4))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_main_thread_converts_prefetched_images(self):
+        model = DialogFacade(self.config)
+        prefetcher = Prefetcher(model, self.cache, self.config.image_path, (4, 4))
+        with mock.patch.object(
+            ImageCache, "load_surface", wraps=ImageCache.load_surface
+        ) as load_surface:
+            prefetcher.request(model.current)
+            self.assertTrue(prefetcher.wait_idle(timeout=5))
+        prefetcher.close()
+        self.assertFalse(any(call.args[3] for call in load_surface.call_args_list))
+
+        end_image = str(Path(self.config.image_path) / "end.png")
+        with mock.patch.object(
+            ImageCache, "convert", wraps=self.cache.convert
+        ) as convert:
+            self.cache.get(end_image, (4, 4))
+            self.cache.get(end_image, (4, 4))
+        convert.assert_called_once()
+
+    def test_errors_do_not_stop_the_thread(self):
+        model = mock.Mock()
+        model.peek.side_effect = RuntimeError("broken")
+        prefetcher = Prefetcher(model, self.cache, self.config.image_path, (4, 4))
+        node = DialogFacade(self.config).current
+
+        with self.assertLogs("pynarrator", level="ERROR"):
+            prefetcher.request(node)
+            self.assertTrue(prefetcher.wait_idle(timeout=5))
+        model.peek.side_effect = None
+        model.peek.return_value = None
+        prefetcher.request(node)
+        self.assertTrue(prefetcher.wait_idle(timeout=5))
+        prefetcher.close()
+        self.assertEqual(model.peek.call_count, 1 + len(node.options))
+
+    def test_concurrent_requests_decode_once(self):
+        path = str(Path(self.config.image_path) / "root.png")
+        started, release = threading.Event(), threading.Event()
+        load_surface = ImageCache.load_surface
+
+        def slow_load(*args):
+            started.set()
+            release.wait(5)
+            return load_surface(*args)
+
+        with mock.patch.object(ImageCache, "load_surface", side_effect=slow_load):
+            worker = threading.Thread(target=self.cache.get, args=(path, (4, 4)))
+            worker.start()
+            started.wait(5)
+            # the main thread waits for the image being decoded by the worker
+            threading.Timer(0.05, release.set).start()
+            surface = self.cache.get(path, (4, 4))
+            worker.join()
+
+        self.assertEqual(surface.get_size(), (4, 4))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pygame
+from config import Config
+from controller.name_screen import NameScreenController
+from view.menu import MenuView
+from view.name_screen import NameScreenView
+
+# headless display, views draw to the dummy screen surface
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+IMAGE_PATH = Path(__file__).resolve().parents[2] / "img"
+
+
+def pixels(surface: pygame.Surface) -> bytes:
+    return pygame.image.tobytes(surface, "RGB")
+
+
+class TestDirtyRendering(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.display.init()
+        pygame.font.init()
+        cls.config = Config(image_path=str(IMAGE_PATH))
+        cls.screen = pygame.display.set_mode((cls.config.width, cls.config.height))
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.display.quit()
+
+    def setUp(self):
+        # the mouse is away from every option unless a test hovers one
+        patcher = mock.patch("pygame.mouse.get_pos", return_value=(0, 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_full_redraw_only_after_invalidate(self):
+        view = MenuView(self.config, None, self.screen)
+        self.assertEqual(view.render(), [self.screen.get_rect()])
+        # nothing changed
+        self.assertEqual(view.render(), [])
+
+        view.invalidate()
+        self.assertEqual(view.render(), [self.screen.get_rect()])
+
+    def test_hover_updates_only_the_option(self):
+        view = MenuView(self.config, None, self.screen)
+        view.render()
+        box = view.option_boxes[1]
+
+        view.hover(view.option_rects[1].center)
+        self.assertEqual(view.render(), [box])
+        self.assertNotEqual(pixels(self.screen), pixels(view.current_frame.surface))
+
+        view.hover((0, 0))
+        self.assertEqual(view.render(), [box])
+        self.assertEqual(pixels(self.screen), pixels(view.current_frame.surface))
+
+        # moving inside the same option changes nothing
+        view.hover(view.option_rects[1].center)
+        view.render()
+        view.hover(view.option_rects[1].move(1, 0).center)
+        self.assertEqual(view.render(), [])
+
+    def test_typing_matches_a_full_redraw(self):
+        view = NameScreenView(self.config, None, self.screen)
+        controller = NameScreenController(self.config, None, view)
+        view.render()
+
+        # the prompt grows and shrinks (backspace) without a full redraw
+        for key, char in (
+            (pygame.K_a, "a"),
+            (pygame.K_b, "b"),
+            (pygame.K_BACKSPACE, ""),
+        ):
+            controller.handle_events(
+                pygame.event.Event(pygame.KEYDOWN, key=key, unicode=char)
+            )
+            rects = view.render()
+            self.assertNotIn(self.screen.get_rect(), rects)
+            self.assertTrue(rects)
+        partial = pixels(self.screen)
+
+        view.invalidate()
+        view.render()
+        self.assertEqual(partial, pixels(self.screen))
+
+
+if __name__ == "__main__":
+    unittest.main()